@@ -1,16 +1,25 @@
 import os
+import time
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from app.models import db
-from app.seed_admin import create_admin
+from app.extensions import migrate
 
 def create_app():
+    """
+    Build the app without touching the database, so it is safe to preload in
+    the gunicorn master. Schema and admin setup live in `flask bootstrap`.
+    """
+    started = time.perf_counter()
     app = Flask(__name__)
 
     # 1. BASIC CONFIG
     app.url_map.strict_slashes = False
 
+    from app.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     # 2. CORS CONFIGURATION (REPLACE PREVIOUS CORS BLOCKS)
     # Reads environment variable or defaults to your exact production/local URLs
     raw_origins = os.getenv(
@@ -25,6 +34,7 @@ def create_app():
         resources={r"/*": {"origins": allowed_origins}},
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
+        expose_headers=["Link", "X-Next-Cursor", "X-Search-Mode"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     )
 
@@ -37,39 +47,56 @@ def create_app():
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
     if database_url and "postgresql://" in database_url:
-        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-            "connect_args": {"sslmode": "require"}
-        }
+        from app.utils.pool import postgres_engine_options
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = postgres_engine_options()
+    else:
+        from app.utils.pool import register_sqlite_pragmas
+        register_sqlite_pragmas()
 
     # 4. JWT & EXTENSIONS
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret")
+
+    from app.utils.passwords import configure_from_env
+    from app.utils.search import include_name, register_search_index
+    configure_from_env(app)
     db.init_app(app)
+    migrate.init_app(
+        app,
+        db,
+        directory=os.path.join(os.path.dirname(app.root_path), "migrations"),
+        render_as_batch=True,  # batch mode lets SQLite ALTER tables
+        include_name=include_name  # the member search index is managed by hand
+    )
     JWTManager(app)
 
-    # 5. INITIALIZATION (DB & ADMIN)
-    with app.app_context():
-        try:
-            db.create_all()
-            create_admin()  # Call this INSIDE context to avoid "Outside Context" errors
-            print("✅ Database and Admin initialized!")
-        except Exception as e:
-            print(f"❌ Initialization error: {e}")
-
-    # 6. REGISTER BLUEPRINTS
-    from app.routes.auth import auth_bp
-    from app.routes.sacraments import sacraments_bp
-    from app.routes.donations import donations_bp
-    from app.routes.announcement import announcements_bp
-    from app.routes.events import events_bp
-    from app.routes.members import members_bp
-    from app.routes.districts import districts_bp
-
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(announcements_bp)
-    app.register_blueprint(events_bp)
-    app.register_blueprint(members_bp)
-    app.register_blueprint(sacraments_bp)
-    app.register_blueprint(donations_bp)
-    app.register_blueprint(districts_bp)
+    from app.utils.caching import register_version_tracking
+    from app.utils.roles import register_role_tracking
+    register_version_tracking()
+    register_role_tracking()
+    register_search_index()
+
+    from app.utils.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+
+    extensions_done = time.perf_counter()
+
+    # 5. REGISTER BLUEPRINTS
+    from app.routes import register_routes
+    register_routes(app)
+    blueprints_done = time.perf_counter()
+
+    # 6. CLI COMMANDS
+    from app.commands import register_commands
+    register_commands(app)
+
+    # 7. BACKGROUND JOB TYPES (runners start in gunicorn workers or `flask run-jobs`)
+    from app.jobs import register_jobs
+    register_jobs()
+
+    print(
+        f"⏱️ App created in {(time.perf_counter() - started) * 1000:.1f} ms "
+        f"(config/extensions {(extensions_done - started) * 1000:.1f} ms, "
+        f"blueprints {(blueprints_done - extensions_done) * 1000:.1f} ms)"
+    )
 
     return app
\ No newline at end of file
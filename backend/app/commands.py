@@ -0,0 +1,146 @@
+import json
+import time
+from functools import wraps
+import click
+from flask.cli import with_appcontext
+
+
+def maintenance(f):
+    """
+    Run a one-off command without the server's per-statement timeout, which
+    is sized for web requests. Goes below @with_appcontext.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        from app.extensions import db
+        from app.utils.pool import exempt_statement_timeout
+
+        exempt_statement_timeout(db.engine)
+        return f(*args, **kwargs)
+    return wrapper
+
+
+@click.command("rebuild-rollups")
+@with_appcontext
+@maintenance
+def rebuild_rollups_command():
+    """Recompute the monthly donation rollups from the donation table."""
+    from app.utils.rollups import rebuild_rollups
+
+    rows = rebuild_rollups()
+    click.echo(f"✅ Rebuilt {rows} donation rollup rows")
+
+
+@click.command("bootstrap")
+@with_appcontext
+@maintenance
+def bootstrap_command():
+    """Migrate the database to the latest schema and create the admin user."""
+    from flask_migrate import upgrade
+    from app.seed_admin import create_admin
+
+    started = time.perf_counter()
+    upgrade()
+    create_admin()
+    click.echo(f"✅ Bootstrap finished in {time.perf_counter() - started:.2f}s")
+
+
+@click.command("generate-data")
+@click.option("--members", type=int, default=10000, show_default=True)
+@click.option("--districts", type=int, default=40, show_default=True)
+@click.option("--years", type=float, default=3, show_default=True, help="Years of donation history.")
+@click.option("--donations-per-year", type=float, default=24, show_default=True,
+              help="Mean donations per member per year.")
+@click.option("--events-per-year", type=float, default=52, show_default=True)
+@click.option("--announcements", type=int, default=300, show_default=True)
+@click.option("--seed", type=int, default=42, show_default=True)
+@click.option("--anchor-date", help="Last day of generated history, YYYY-MM-DD (default: a fixed date, "
+              "so a seed always gives the same rows).")
+@click.option("--chunk-size", type=int, default=10000, show_default=True, help="Rows per executemany.")
+@click.option("--config", "config_file", type=click.File(), help="JSON file overriding any generator option, "
+              "e.g. {\"donation_types\": {\"tithe\": 0.8, \"offering\": 0.2}, \"family_size\": [2, 8]}.")
+@with_appcontext
+@maintenance
+def generate_data_command(config_file, **options):
+    """Append a synthetic parish using bulk inserts (does not drop existing data)."""
+    from app.utils.datagen import generate
+
+    if options["anchor_date"] is None:
+        del options["anchor_date"]
+    if config_file:
+        options.update(json.load(config_file))
+
+    started = time.perf_counter()
+    try:
+        counts = generate(progress=click.echo, **options)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(f"✅ Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+
+@click.command("generate-statements")
+@click.option("--year", type=int, required=True)
+@click.option("--out", "root", type=click.Path(file_okay=False), help="Output folder (default: STATEMENTS_DIR "
+              "or instance/statements); statements go in <out>/<year>/.")
+@click.option("--zip", "zip_path", type=click.Path(dir_okay=False), help="Also pack the statements into this ZIP.")
+@click.option("--workers", type=int, default=None, help="Render processes (0 renders in-process).")
+@click.option("--resume/--no-resume", default=True, show_default=True,
+              help="Keep statements already written by an earlier run.")
+@with_appcontext
+@maintenance
+def generate_statements_command(year, root, zip_path, workers, resume):
+    """Write one giving statement per member who donated in YEAR."""
+    from app.utils.statements import generate_statements, statement_dir, write_zip
+
+    def progress(state):
+        click.echo(f"  {state['done'] + state['skipped']}/{state['total']} statements")
+
+    started = time.perf_counter()
+    state = generate_statements(year, root, workers=workers, resume=resume, progress=progress)
+    click.echo(
+        f"✅ Wrote {state['done']} statements ({state['skipped']} already done) to "
+        f"{statement_dir(year, root)} in {time.perf_counter() - started:.1f}s"
+    )
+    if zip_path:
+        write_zip(year, zip_path, root)
+        click.echo(f"📦 Packed statements into {zip_path}")
+
+
+@click.command("purge-claim-codes")
+@click.option("--district-id", type=int, help="Only this district (default: the whole parish).")
+@with_appcontext
+@maintenance
+def purge_claim_codes_command(district_id):
+    """Clear expired member claim codes."""
+    from app.utils.claim_codes import purge_expired_codes
+
+    click.echo(f"✅ Purged {purge_expired_codes(district_id)} expired claim codes")
+
+
+@click.command("run-jobs")
+@click.option("--workers", type=int, default=2, show_default=True, help="Jobs run at once by this process.")
+@with_appcontext
+def run_jobs_command(workers):
+    """Run queued background jobs until interrupted (no web server needed)."""
+    from flask import current_app
+    from app.utils.jobs import start_job_runner
+
+    runner = start_job_runner(current_app._get_current_object(), workers=workers)
+    if runner is None:
+        raise click.BadParameter("workers must be at least 1")
+    click.echo(f"👷 Running jobs with {workers} workers as {runner.name} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        click.echo("🛑 Stopping after the current jobs finish ...")
+        runner.stop()
+
+
+def register_commands(app):
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(generate_data_command)
+    app.cli.add_command(generate_statements_command)
+    app.cli.add_command(run_jobs_command)
+    app.cli.add_command(purge_claim_codes_command)
@@ -0,0 +1,63 @@
+import os
+from flask import current_app
+from app.utils.jobs import register_job
+
+
+def rebuild_rollups_job(ctx):
+    from app.utils.rollups import rebuild_rollups
+
+    return {"rows": rebuild_rollups()}
+
+
+def generate_statements_job(ctx, year, workers=None, resume=True):
+    from app.utils.statements import generate_statements
+
+    def progress(state):
+        ctx.progress(state["done"] + state["skipped"], state["total"])
+
+    state = generate_statements(year, workers=workers, resume=resume, progress=progress)
+    return {key: state[key] for key in ("year", "total", "done", "skipped")}
+
+
+def export_donations_job(ctx, **params):
+    """
+    Same arguments as GET /donations/export (format, fields, filters),
+    written to a file in the job's folder instead of streamed.
+    """
+    from app.routes.donations import export_rows, export_chunks
+
+    # Replays the arguments as a query string so the route's own parsing applies
+    with current_app.test_request_context(query_string={k: str(v) for k, v in params.items()}):
+        export_format, fields, rows = export_rows()
+
+        def counted():
+            for count, row in enumerate(rows, start=1):
+                if count % 10000 == 0:
+                    ctx.progress(count)
+                yield row
+
+        path = ctx.output_path(f"donations.{export_format}")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for chunk in export_chunks(export_format, fields, counted()):
+                f.write(chunk)
+
+    return {"file": os.path.basename(path), "bytes": os.path.getsize(path)}
+
+
+def import_members_job(ctx, members):
+    """
+    Same rows as POST /members/import, for uploads too big for one request.
+    """
+    from app.routes.members import import_member_rows
+
+    if not isinstance(members, list):
+        raise ValueError("members must be a list")
+    created, errors = import_member_rows(members, progress=ctx.progress)
+    return {"imported": len(created), "created": created, "errors": errors}
+
+
+def register_jobs():
+    register_job("rebuild-rollups", rebuild_rollups_job, limit=1)
+    register_job("generate-statements", generate_statements_job, limit=1)
+    register_job("export-donations", export_donations_job, limit=2)
+    register_job("import-members", import_members_job, limit=1)
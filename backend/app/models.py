@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from app.utils.money import Money
 
 # ---------- User / Roles ----------
 class User(db.Model):
@@ -41,6 +42,20 @@ class Member(db.Model):
     # Relationships
     user = db.relationship("User", back_populates="member")
 
+    __table_args__ = (
+        db.Index('ix_member_district_name', 'district_id', 'name'),  # district pages, member counts
+        db.Index('ix_member_status_id', 'status', 'id'),  # ?status= filter paged by id
+        # Covers claim-code checks so sign-up never reads the member row;
+        # partial, so linked members (no code) aren't indexed at all. SQLite
+        # indexes carry the rowid; Postgres needs id INCLUDEd for that
+        db.Index(
+            'ix_member_claim_code_lookup', 'claim_code', 'claim_code_expires_at', 'user_id',
+            sqlite_where=db.text('claim_code IS NOT NULL'),
+            postgresql_where=db.text('claim_code IS NOT NULL'),
+            postgresql_include=['id']
+        ),
+    )
+
 
 # ---------- Sacraments ----------
 class Sacrament(db.Model):
@@ -56,6 +71,10 @@ class Sacrament(db.Model):
 
     member = db.relationship('Member', backref=db.backref('sacraments', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_sacrament_member_date', 'member_id', 'date'),
+    )
+
 # ---------- Events / Mass ----------
 class Event(db.Model):
     __tablename__ = 'event'
@@ -66,6 +85,27 @@ class Event(db.Model):
     date = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_event_date_id', 'date', 'id'),  # calendar ranges, date-ordered pages
+    )
+
+# ---------- Recurring Events (weekly Masses etc.) ----------
+class EventSeries(db.Model):
+    __tablename__ = 'event_series'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.String(250))
+    rrule = db.Column(db.String(255), nullable=False)  # e.g. FREQ=WEEKLY;BYDAY=SU
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)  # last occurrence; NULL repeats forever
+    exdates = db.Column(db.JSON)  # ISO dates skipped, e.g. a cancelled Mass
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_event_series_start_end', 'start_date', 'end_date'),  # series overlapping a window
+    )
+
 # ---------- Church Districts / Jumuiya ----------
 class District(db.Model):
     __tablename__ = 'district'
@@ -85,13 +125,37 @@ class Donation(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)  # stored in cents
     type = db.Column(db.String(50), default='tithe')  # tithe / offering / pledge
     date = db.Column(db.Date, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    batch_id = db.Column(db.Integer, db.ForeignKey('donation_batch.id'), nullable=True)
 
     member = db.relationship('Member', backref=db.backref('donations', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_donation_member_date', 'member_id', 'date'),  # my-donations (scanned backwards for DESC)
+        db.Index('ix_donation_date', 'date'),  # date ranges, exports, rollup rebuilds
+        db.Index('ix_donation_batch_id', 'batch_id'),
+    )
+
+
+# ---------- Donation Batches (Sunday collection tallies) ----------
+class DonationBatch(db.Model):
+    __tablename__ = 'donation_batch'
+
+    id = db.Column(db.Integer, primary_key=True)
+    label = db.Column(db.String(150))  # e.g. "Sunday 8AM Mass"
+    date = db.Column(db.Date, nullable=False)
+    total = db.Column(Money, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='posted')  # posted / voided
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    voided_at = db.Column(db.DateTime)
+
+    donations = db.relationship('Donation', backref='batch', lazy=True)
+
 # ---------- Announcements ----------
 class Announcement(db.Model):
     __tablename__ = 'announcement'
@@ -106,4 +170,61 @@ class Announcement(db.Model):
     publish_date = db.Column(db.Date, default=datetime.utcnow)
     expiry_date = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    district_id = db.Column(db.Integer, db.ForeignKey('district.id'))
\ No newline at end of file
+    district_id = db.Column(db.Integer, db.ForeignKey('district.id'))  # None = whole parish
+
+    __table_args__ = (
+        # Serve the active feed: publish_date <= today < expiry_date, per district
+        db.Index('ix_announcement_publish_expiry', 'publish_date', 'expiry_date'),
+        db.Index('ix_announcement_district_publish', 'district_id', 'publish_date'),
+    )
+
+# ---------- Donation Rollups (monthly giving totals) ----------
+class DonationRollup(db.Model):
+    __tablename__ = 'donation_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
+    district_id = db.Column(db.Integer, db.ForeignKey('district.id'))  # district at time of giving
+    type = db.Column(db.String(50), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    total = db.Column(Money, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('member_id', 'type', 'month', name='uq_donation_rollup_key'),
+        db.Index('ix_donation_rollup_month', 'month'),
+    )
+
+
+# ---------- Collection Versions (HTTP cache validators) ----------
+class CollectionVersion(db.Model):
+    __tablename__ = 'collection_version'
+
+    name = db.Column(db.String(50), primary_key=True)  # members / districts / events / announcements
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# ---------- Background Jobs ----------
+class Job(db.Model):
+    __tablename__ = 'job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # registered job type, e.g. rebuild-rollups
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued / running / succeeded / failed / cancelled
+    params = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    progress = db.Column(db.JSON)  # {"done": n, "total": n}
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    worker = db.Column(db.String(100))  # host:pid running it
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed while running; stale means the worker died
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_job_status_id', 'status', 'id'),  # claiming the oldest queued job
+        db.Index('ix_job_kind_status', 'kind', 'status'),  # per-kind concurrency limits
+    )
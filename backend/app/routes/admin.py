@@ -0,0 +1,109 @@
+import os
+from flask import Blueprint, jsonify, request, send_file, url_for
+from flask_jwt_extended import get_jwt_identity
+from app.extensions import db
+from app.models import Job
+from app.utils.roles import admin_required
+from app.utils.jobs import enqueue, cancel, jobs_root, JOB_STATUSES
+from app.utils.pagination import keyset_page, page_response
+from app.utils.serializers import job_serializer
+from app.utils.pool import pool_stats
+from app.utils.slow_queries import recent_slow_queries, clear_slow_queries, settings as slow_query_settings
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+# ---------------- CONNECTION POOL ----------------
+@admin_bp.route("/pool", methods=["GET"])
+@admin_required()
+def get_pool_stats():
+    return jsonify(pool_stats(db.engine)), 200
+
+
+# ---------------- SLOW QUERIES ----------------
+@admin_bp.route("/slow-queries", methods=["GET"])
+@admin_required()
+def get_slow_queries():
+    return jsonify({
+        "threshold_ms": slow_query_settings["threshold_ms"],
+        "queries": recent_slow_queries()
+    }), 200
+
+
+@admin_bp.route("/slow-queries", methods=["DELETE"])
+@admin_required()
+def delete_slow_queries():
+    clear_slow_queries()
+    return jsonify({"message": "Slow query log cleared"}), 200
+
+
+# ---------------- BACKGROUND JOBS ----------------
+@admin_bp.route("/jobs", methods=["POST"])
+@admin_required()
+def create_job():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get("type"), str):
+        return jsonify({"error": "type is required and must be a string"}), 400
+    params = data.get("params") or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "params must be an object"}), 400
+
+    try:
+        job = enqueue(data.get("type"), params, created_by=int(get_jwt_identity()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(job_serializer.dump_object(job))
+    response.headers["Location"] = url_for("admin.get_job", id=job.id)
+    return response, 202
+
+
+@admin_bp.route("/jobs", methods=["GET"])
+@admin_required()
+def list_jobs():
+    try:
+        fields = job_serializer.requested()
+        query = job_serializer.query(fields, Job.id)
+        if request.args.get("status"):
+            if request.args["status"] not in JOB_STATUSES:
+                raise ValueError(f"status must be one of: {', '.join(JOB_STATUSES)}")
+            query = query.filter(Job.status == request.args["status"])
+        if request.args.get("type"):
+            query = query.filter(Job.kind == request.args["type"])
+        page = keyset_page(query, Job.id, sort_columns={"id": Job.id}, default_sort="-id")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return page_response(job_serializer.dump(page.items, fields), page.next_cursor), 200
+
+
+@admin_bp.route("/jobs/<int:id>", methods=["GET"])
+@admin_required()
+def get_job(id):
+    job = Job.query.get_or_404(id)
+    return jsonify(job_serializer.dump_object(job, list(job_serializer.fields))), 200
+
+
+@admin_bp.route("/jobs/<int:id>/cancel", methods=["POST"])
+@admin_required()
+def cancel_job(id):
+    job = Job.query.get_or_404(id)
+    if not cancel(job):
+        return jsonify({"error": f"Job already {job.status}"}), 409
+
+    message = "Job cancelled" if job.status == "cancelled" else "Cancellation requested"
+    return jsonify({"message": message, "job": job_serializer.dump_object(job)}), 200
+
+
+@admin_bp.route("/jobs/<int:id>/download", methods=["GET"])
+@admin_required()
+def download_job_result(id):
+    job = Job.query.get_or_404(id)
+    filename = (job.result or {}).get("file") if job.status == "succeeded" else None
+    if not filename:
+        return jsonify({"error": "This job has no file to download"}), 404
+
+    path = os.path.join(jobs_root(), str(job.id), filename)
+    if not os.path.isfile(path):
+        return jsonify({"error": "The job's file has expired"}), 410
+    return send_file(path, as_attachment=True, download_name=filename)
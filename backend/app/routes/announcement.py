@@ -1,11 +1,30 @@
 from flask import Blueprint, request, jsonify
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import or_
 from app.extensions import db
 from app.models import Announcement
 from app.utils.roles import admin_required
+from app.utils.pagination import keyset_page, page_response, filter_date_range, get_limit
+from app.utils.caching import conditional, TTLCache
+from app.utils.serializers import announcement_serializer
 
 announcements_bp = Blueprint("announcements", __name__, url_prefix="/announcements")
 
+# Active feed responses, keyed by (today, district_id, limit, fields); the
+# keys come from query params, so the number kept is bounded
+ACTIVE_FEED_TTL = 30
+ACTIVE_FEED_MAX_ENTRIES = 256
+active_feed_cache = TTLCache(ACTIVE_FEED_TTL, max_entries=ACTIVE_FEED_MAX_ENTRIES)
+
+
+def parse_optional_date(value):
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("date must be a string")
+    return date.fromisoformat(value[:10])
+
+
 # OPTIONS handler
 
 
@@ -15,37 +34,94 @@ announcements_bp = Blueprint("announcements", __name__, url_prefix="/announcemen
 def create_announcement():
     data = request.get_json()
 
+    try:
+        expiry_date = parse_optional_date(data.get("expiry_date"))
+    except ValueError:
+        return jsonify({"error": "Invalid expiry_date. Use YYYY-MM-DD"}), 400
+
     announcement = Announcement(
         title=data.get("title"),
         message=data.get("message"),
         category=data.get("category", "general"),
         publish_date=datetime.utcnow(),
-        expiry_date=data.get("expiry_date")
+        expiry_date=expiry_date,
+        district_id=data.get("district_id")
     )
 
     db.session.add(announcement)
     db.session.commit()
+    active_feed_cache.clear()
 
     return jsonify({"message": "Announcement created", "id": announcement.id}), 201
 
 
 # ---------------- GET ALL ANNOUNCEMENTS ----------------
 @announcements_bp.route("/", methods=["GET"], strict_slashes=False)
+@conditional("announcements")
 def get_announcements():
-    announcements = Announcement.query.order_by(
-        Announcement.publish_date.desc()
-    ).all()
-
-    results = []
-    for a in announcements:
-        results.append({
-            "id": a.id,
-            "title": a.title,
-            "message": a.message,
-            "category": a.category,
-            "publish_date": a.publish_date.isoformat() if a.publish_date else None,  # Fixed serialization
-            "expiry_date": a.expiry_date.isoformat() if a.expiry_date else None  # Fixed serialization
-        })
+    try:
+        fields = announcement_serializer.requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sort_columns = {"id": Announcement.id, "publish_date": Announcement.publish_date}
+    query = announcement_serializer.query(fields, *sort_columns.values())
+
+    if request.args.get("category"):
+        query = query.filter(Announcement.category == request.args["category"])
+    if request.args.get("district_id"):
+        query = query.filter(Announcement.district_id == request.args.get("district_id", type=int))
+
+    try:
+        query = filter_date_range(query, Announcement.publish_date)
+        page = keyset_page(query, Announcement.id, sort_columns=sort_columns, default_sort="-publish_date")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = announcement_serializer.dump(page.items, fields)
+
+    return page_response(results, page.next_cursor), 200
+
+
+# ---------------- ACTIVE ANNOUNCEMENTS FEED ----------------
+@announcements_bp.route("/active", methods=["GET"])
+def get_active_announcements():
+    raw_district = request.args.get("district_id")
+    district_id = int(raw_district) if raw_district and raw_district.isdecimal() else None
+    if raw_district and not district_id:
+        return jsonify({"error": "district_id must be a positive integer"}), 400
+    try:
+        limit = get_limit()
+        fields = announcement_serializer.requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # publish_date is stored in UTC, so "today" is the UTC date too
+    today = datetime.utcnow().date()
+    cache_key = (today, district_id, limit, tuple(fields))
+    results = active_feed_cache.get(cache_key)
+
+    if results is None:
+        query = announcement_serializer.query(fields).filter(
+            Announcement.publish_date <= today,
+            or_(Announcement.expiry_date.is_(None), Announcement.expiry_date > today)
+        )
+
+        # Parish-wide announcements plus the requested district's own
+        if district_id is not None:
+            query = query.filter(or_(
+                Announcement.district_id.is_(None),
+                Announcement.district_id == district_id
+            ))
+        else:
+            query = query.filter(Announcement.district_id.is_(None))
+
+        rows = query.order_by(
+            Announcement.publish_date.desc(), Announcement.id.desc()
+        ).limit(limit).all()
+
+        results = announcement_serializer.dump(rows, fields)
+        active_feed_cache.set(cache_key, results)
 
     return jsonify(results), 200
 
@@ -53,16 +129,14 @@ def get_announcements():
 # ---------------- GET SINGLE ANNOUNCEMENT ----------------
 @announcements_bp.route("/<int:id>", methods=["GET"])
 def get_announcement(id):
-    a = Announcement.query.get_or_404(id)
+    try:
+        fields = announcement_serializer.requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    row = announcement_serializer.query(fields).filter(Announcement.id == id).first_or_404()
 
-    return jsonify({
-        "id": a.id,
-        "title": a.title,
-        "message": a.message,
-        "category": a.category,
-        "publish_date": a.publish_date.isoformat() if a.publish_date else None,
-        "expiry_date": a.expiry_date.isoformat() if a.expiry_date else None
-    }), 200
+    return jsonify(dict(zip(fields, row))), 200
 
 
 # ---------------- UPDATE ANNOUNCEMENT ----------------
@@ -75,9 +149,16 @@ def update_announcement(id):
     announcement.title = data.get("title", announcement.title)
     announcement.message = data.get("message", announcement.message)
     announcement.category = data.get("category", announcement.category)
-    announcement.expiry_date = data.get("expiry_date", announcement.expiry_date)
+    announcement.district_id = data.get("district_id", announcement.district_id)
+
+    if "expiry_date" in data:
+        try:
+            announcement.expiry_date = parse_optional_date(data["expiry_date"])
+        except ValueError:
+            return jsonify({"error": "Invalid expiry_date. Use YYYY-MM-DD"}), 400
 
     db.session.commit()
+    active_feed_cache.clear()
 
     return jsonify({"message": "Announcement updated"}), 200
 
@@ -90,5 +171,6 @@ def delete_announcement(id):
 
     db.session.delete(announcement)
     db.session.commit()
+    active_feed_cache.clear()
 
     return jsonify({"message": "Announcement deleted"}), 200
\ No newline at end of file
@@ -1,13 +1,13 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     create_access_token,
     jwt_required,
     get_jwt_identity
 )
 from app.extensions import db
-from app.models import User, Member
-from datetime import datetime
+from app.models import User
+from app.utils.passwords import hash_password, verify_password, needs_rehash, HashingBusyError
+from app.utils.claim_codes import check_claim_code, claim_member
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -32,43 +32,41 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({"error": "User already exists"}), 409
 
-    member = None
-    # If claim code provided, try to find and validate member
+    member_id = None
+    # If claim code provided, validate it up front (index-only lookup)
     if claim_code:
-        member = Member.query.filter_by(claim_code=claim_code).first()
+        try:
+            member_id = check_claim_code(claim_code)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        if not member:
-            return jsonify({"error": "Invalid claim code"}), 400
-
-        if member.user_id:
-            return jsonify({"error": "Member already linked"}), 400
-
-        if member.claim_code_expires_at and member.claim_code_expires_at < datetime.utcnow():
-            return jsonify({"error": "Claim code expired"}), 400
+    try:
+        password_hash = hash_password(password)
+    except HashingBusyError as e:
+        return jsonify({"error": str(e)}), 503
 
     # 1️⃣ Create User
     user = User(
         name=name,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
         role="member"
     )
 
     db.session.add(user)
     db.session.flush()  # get user.id
 
-    # 2️⃣ Link member if found
-    if member:
-        member.user_id = user.id
-        member.claim_code = None
-        member.claim_code_expires_at = None
+    # 2️⃣ Link member if found; the claim re-checks the code atomically
+    if member_id and not claim_member(claim_code, user.id):
+        db.session.rollback()
+        return jsonify({"error": "Claim code has just been used"}), 409
 
     db.session.commit()
 
     return jsonify({
         "message": "Registration successful",
         "user_id": user.id,
-        "member_id": member.id if member else None
+        "member_id": member_id
     }), 201
 
 # ---------------- LINK MEMBER ----------------
@@ -90,27 +88,21 @@ def link_member():
     if user.member:
         return jsonify({"error": "User is already linked to a member profile"}), 400
 
-    member = Member.query.filter_by(claim_code=claim_code).first()
-
-    if not member:
-        return jsonify({"error": "Invalid claim code"}), 400
-
-    if member.user_id:
-        return jsonify({"error": "Member profile is already taken"}), 400
-
-    if member.claim_code_expires_at and member.claim_code_expires_at < datetime.utcnow():
-        return jsonify({"error": "Claim code has expired"}), 400
+    try:
+        member_id = check_claim_code(claim_code)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Link them
-    member.user_id = user.id
-    member.claim_code = None
-    member.claim_code_expires_at = None
-    
+    if not claim_member(claim_code, user.id):
+        db.session.rollback()
+        return jsonify({"error": "Claim code has just been used"}), 409
+
     db.session.commit()
 
     return jsonify({
         "message": "Profile linked successfully",
-        "member_id": member.id
+        "member_id": member_id
     }), 200
 
 
@@ -124,8 +116,16 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user or not check_password_hash(user.password_hash, password):
-        return jsonify({"error": "Invalid email or password"}), 401
+    try:
+        if not user or not verify_password(user.password_hash, password):
+            return jsonify({"error": "Invalid email or password"}), 401
+
+        # Upgrade hashes made with an older method / cost while we have the password
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+    except HashingBusyError as e:
+        return jsonify({"error": str(e)}), 503
 
     # Create access token with user ID as STRING
     token = create_access_token(
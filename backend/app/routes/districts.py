@@ -1,6 +1,15 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from datetime import timedelta
+from flask import Blueprint, request, jsonify, Response
 from app.extensions import db
 from app.utils.roles import admin_required
+from app.utils.pagination import keyset_page
+from app.utils.caching import conditional
+from app.utils.serializers import district_serializer
+from app.utils.claim_codes import (
+    CLAIM_CODE_TTL, MAX_CLAIM_CODE_TTL_DAYS, regenerate_district_codes, code_sheet_rows, render_code_sheet
+)
 from app.models import District, Member
 
 districts_bp = Blueprint("districts", __name__, url_prefix="/districts")
@@ -24,20 +33,17 @@ def create_district():
 
 # ---------------- GET ALL DISTRICTS ----------------
 @districts_bp.route("/", methods=["GET"])
+@conditional("districts")
 def get_districts():
-    districts = District.query.all()
+    try:
+        fields = district_serializer.requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    results = []
-    for d in districts:
-        results.append({
-            "id": d.id,
-            "name": d.name,
-            "leader_name": d.leader_name,
-            "description": d.description,
-            "member_count": len(d.members)
-        })
+    # member_count is a per-district indexed COUNT, only run when requested
+    districts = district_serializer.query(fields, District.id).order_by(District.id)
 
-    return jsonify(results), 200
+    return jsonify(district_serializer.dump(districts, fields)), 200
 
 
 # ---------------- GET SINGLE DISTRICT ----------------
@@ -45,6 +51,18 @@ def get_districts():
 def get_district(id):
     district = District.query.get_or_404(id)
 
+    # Page through id/name pairs only, never the full Member rows
+    members_query = db.session.query(Member.id, Member.name).filter(Member.district_id == id)
+    try:
+        page = keyset_page(
+            members_query,
+            Member.id,
+            sort_columns={"id": Member.id, "name": Member.name},
+            default_sort="name"
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     return jsonify({
         "id": district.id,
         "name": district.name,
@@ -52,8 +70,9 @@ def get_district(id):
         "description": district.description,
         "members": [
             {"id": m.id, "name": m.name}
-            for m in district.members
-        ]
+            for m in page.items
+        ],
+        "members_next_cursor": page.next_cursor
     }), 200
 
 
@@ -81,3 +100,50 @@ def delete_district(id):
     db.session.commit()
 
     return jsonify({"message": "District deleted"}), 200
+
+
+# ---------------- CLAIM CODES ----------------
+@districts_bp.route("/<int:id>/claim-codes", methods=["POST"])
+@admin_required()
+def regenerate_claim_codes(id):
+    District.query.get_or_404(id)
+    data = request.get_json(silent=True) or {}
+
+    ttl_days = data.get("ttl_days", CLAIM_CODE_TTL.days)
+    if isinstance(ttl_days, bool) or not isinstance(ttl_days, int) or not 1 <= ttl_days <= MAX_CLAIM_CODE_TTL_DAYS:
+        return jsonify({"error": f"ttl_days must be between 1 and {MAX_CLAIM_CODE_TTL_DAYS}"}), 400
+
+    # only_missing keeps valid codes that may already have been handed out
+    updated, expires_at = regenerate_district_codes(
+        id, ttl=timedelta(days=ttl_days), only_missing=bool(data.get("only_missing"))
+    )
+    return jsonify({
+        "message": f"Issued {updated} claim codes",
+        "updated": updated,
+        "expires_at": expires_at
+    }), 200
+
+
+@districts_bp.route("/<int:id>/claim-codes", methods=["GET"])
+@admin_required()
+def claim_code_sheet(id):
+    district = District.query.get_or_404(id)
+    sheet_format = request.args.get("format", "html")
+    if sheet_format not in ("html", "csv"):
+        return jsonify({"error": "format must be html or csv"}), 400
+
+    rows = code_sheet_rows(id)
+    if sheet_format == "html":
+        return Response(render_code_sheet(district, rows), mimetype="text/html")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["member_id", "name", "family", "claim_code", "expires_at"])
+    for row in rows:
+        expires_at = row.claim_code_expires_at.isoformat() if row.claim_code_expires_at else None
+        writer.writerow([row.id, row.name, row.family, row.claim_code, expires_at])
+    return Response(
+        buffer.getvalue(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=claim-codes-district-{id}.csv"}
+    )
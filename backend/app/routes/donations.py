@@ -1,27 +1,252 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
-from app.models import Donation, User, Member
+from sqlalchemy import func, insert
+from app.models import Donation, DonationBatch, DonationRollup, User, Member, Job
 from datetime import datetime
+from decimal import Decimal
 from app.utils.roles import admin_required
+from app.utils.pagination import keyset_page, page_response, filter_date_range, parse_date_arg
+from app.utils.rollups import adjust_rollups, record_donation, remove_donation, month_start
+from app.utils.serializers import donation_serializer, batch_serializer
+from app.utils.statements import (
+    giving_query, iter_statements, render_statement, read_progress, is_running, statement_files,
+    iter_zip, parish_name
+)
+from app.utils.jobs import enqueue
+from app.utils.money import Money, money_avg, parse_amount
 
 donations_bp = Blueprint('donations', __name__, url_prefix='/donations')
 
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ['id', 'member_id', 'amount', 'type', 'date', 'created_at']
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+MIN_STATEMENT_YEAR = 1900
+
+
+def check_statement_year(year):
+    if not MIN_STATEMENT_YEAR <= year <= datetime.utcnow().year:
+        raise ValueError(f'year must be between {MIN_STATEMENT_YEAR} and {datetime.utcnow().year}')
+
+
+def active_statement_job(year):
+    """
+    Id of a queued or running generate-statements job for `year`, if any.
+    """
+    active = (
+        db.session.query(Job.id, Job.params)
+        .filter(Job.kind == 'generate-statements', Job.status.in_(('queued', 'running')))
+        .all()
+    )
+    return next((job_id for job_id, params in active if (params or {}).get('year') == year), None)
+
+
+def filter_donations(query):
+    """
+    Apply the shared ?member_id, ?type, ?district_id and date range filters.
+    """
+    if request.args.get('member_id'):
+        query = query.filter(Donation.member_id == request.args.get('member_id', type=int))
+    if request.args.get('type'):
+        query = query.filter(Donation.type == request.args['type'])
+    if request.args.get('district_id'):
+        query = query.join(Member).filter(Member.district_id == request.args.get('district_id', type=int))
+    return filter_date_range(query, Donation.date)
+
+
+def export_rows():
+    """
+    Format, fields and streamed rows for an export, from ?format=, ?fields=
+    and the donation filters. Raises ValueError on bad arguments.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_MIMETYPES:
+        raise ValueError('format must be csv or ndjson')
+
+    fields = donation_serializer.requested(default=EXPORT_COLUMNS)
+    query = filter_donations(donation_serializer.query(fields))
+
+    # Plain column tuples streamed through a server-side cursor, so memory
+    # stays flat no matter how many rows match.
+    return export_format, fields, query.order_by(Donation.id).yield_per(EXPORT_BATCH_SIZE)
+
+
+def export_chunks(export_format, fields, rows):
+    """
+    Encode rows as CSV or NDJSON text, yielded in chunks of about 64 KB.
+    """
+    dumps = current_app.json.dumps
+    buffer = io.StringIO()
+
+    if export_format == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([v.isoformat() if hasattr(v, 'isoformat') else v for v in row])
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    else:
+        for row in rows:
+            buffer.write(dumps(dict(zip(fields, row))) + '\n')
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
 # ============== ADMIN ROUTES ==============
 
 # Get all donations (admin only)
 @donations_bp.route('/', methods=['GET'], strict_slashes=False)
 @admin_required()
 def get_all_donations():
-    donations = Donation.query.all()
-    return jsonify([{
-        'id': d.id,
-        'member_id': d.member_id,
-        'amount': float(d.amount),
-        'type': d.type,
-        'date': d.date.isoformat() if d.date else None,
-        'created_at': d.created_at.isoformat() if d.created_at else None
-    } for d in donations]), 200
+    try:
+        fields = donation_serializer.requested()
+        sort_columns = {'id': Donation.id, 'date': Donation.date, 'amount': Donation.amount}
+        query = filter_donations(donation_serializer.query(fields, *sort_columns.values()))
+        page = keyset_page(query, Donation.id, sort_columns=sort_columns, default_sort='id')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(donation_serializer.dump(page.items, fields), page.next_cursor), 200
+
+# Export donations as CSV or NDJSON (admin only); large exports can run as
+# an export-donations job instead
+@donations_bp.route('/export', methods=['GET'])
+@admin_required()
+def export_donations():
+    try:
+        export_format, fields, rows = export_rows()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filename = f'donations.{export_format}'
+    return Response(
+        stream_with_context(export_chunks(export_format, fields, rows)),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# Giving totals by period, served from the monthly rollup (admin only)
+@donations_bp.route('/summary', methods=['GET'])
+@admin_required()
+def donations_summary():
+    period = request.args.get('period', 'month')
+    if period not in ('month', 'year'):
+        return jsonify({'error': 'period must be month or year'}), 400
+
+    group_fields = [g for g in request.args.get('group_by', '').split(',') if g]
+    group_columns = {
+        'type': DonationRollup.type,
+        'district_id': DonationRollup.district_id,
+        'member_id': DonationRollup.member_id
+    }
+    for g in group_fields:
+        if g not in group_columns:
+            return jsonify({'error': 'group_by accepts type, district_id, member_id'}), 400
+
+    if period == 'month':
+        period_col = DonationRollup.month.label('period')
+    else:
+        period_col = func.extract('year', DonationRollup.month).label('period')
+
+    query = db.session.query(
+        period_col,
+        *[group_columns[g].label(g) for g in group_fields],
+        func.sum(DonationRollup.total).label('total'),
+        func.sum(DonationRollup.count).label('count'),
+        money_avg(func.sum(DonationRollup.total), func.sum(DonationRollup.count)).label('average')
+    ).having(func.sum(DonationRollup.count) > 0)
+
+    if request.args.get('member_id'):
+        query = query.filter(DonationRollup.member_id == request.args.get('member_id', type=int))
+    if request.args.get('type'):
+        query = query.filter(DonationRollup.type == request.args['type'])
+    if request.args.get('district_id'):
+        query = query.filter(DonationRollup.district_id == request.args.get('district_id', type=int))
+
+    try:
+        date_from = parse_date_arg('date_from')
+        date_to = parse_date_arg('date_to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Rollups are monthly, so the range is applied at month granularity
+    if date_from:
+        query = query.filter(DonationRollup.month >= month_start(date_from))
+    if date_to:
+        query = query.filter(DonationRollup.month <= date_to)
+
+    group_by = [period_col] + [group_columns[g] for g in group_fields]
+    rows = query.group_by(*group_by).order_by(*group_by).all()
+
+    results = []
+    for row in rows:
+        item = {
+            'period': row.period.strftime('%Y-%m') if period == 'month' else int(row.period),
+            'total': row.total or Decimal('0.00'),
+            'count': int(row.count or 0),
+            'average': row.average
+        }
+        for g in group_fields:
+            item[g] = getattr(row, g)
+        results.append(item)
+
+    return jsonify(results), 200
+
+# Exact totals straight from the donation rows for any day range, with the
+# usual donation filters; ?group_by=type,member_id,district_id (admin only)
+@donations_bp.route('/totals', methods=['GET'])
+@admin_required()
+def donations_totals():
+    group_fields = [g for g in request.args.get('group_by', '').split(',') if g]
+    group_columns = {
+        'type': Donation.type,
+        'member_id': Donation.member_id,
+        'district_id': Member.district_id
+    }
+    for g in group_fields:
+        if g not in group_columns:
+            return jsonify({'error': 'group_by accepts type, district_id, member_id'}), 400
+
+    # Every figure is computed by the database; only the grouped rows come back
+    query = db.session.query(
+        *[group_columns[g].label(g) for g in group_fields],
+        func.sum(Donation.amount).label('total'),
+        func.count(Donation.id).label('count'),
+        func.avg(Donation.amount, type_=Money()).label('average'),
+        func.min(Donation.amount).label('min'),
+        func.max(Donation.amount).label('max')
+    ).select_from(Donation)
+    if 'district_id' in group_fields and not request.args.get('district_id'):
+        query = query.join(Member)
+
+    try:
+        query = filter_donations(query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def totals(row):
+        item = {g: getattr(row, g) for g in group_fields}
+        item.update(
+            total=row.total or Decimal('0.00'),
+            count=row.count,
+            average=row.average,
+            min=row.min,
+            max=row.max
+        )
+        return item
+
+    if not group_fields:
+        return jsonify(totals(query.one())), 200
+
+    group_by = [group_columns[g] for g in group_fields]
+    return jsonify([totals(row) for row in query.group_by(*group_by).order_by(*group_by)]), 200
 
 # Create donation for any member (admin only)
 @donations_bp.route('/admin/add', methods=['POST'], strict_slashes=False)
@@ -31,6 +256,11 @@ def admin_create_donation():
     
     if not data.get('member_id') or not data.get('amount') or not data.get('type'):
         return jsonify({'error': 'member_id, amount, and type are required'}), 400
+
+    try:
+        amount = parse_amount(data['amount'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Validate member exists
     member = Member.query.get(data['member_id'])
@@ -47,12 +277,13 @@ def admin_create_donation():
     
     donation = Donation(
         member_id=data['member_id'],
-        amount=data['amount'],
+        amount=amount,
         type=data.get('type', 'tithe'),
         date=donation_date
     )
     
     db.session.add(donation)
+    record_donation(donation, member.district_id)
     db.session.commit()
     
     return jsonify({
@@ -60,7 +291,7 @@ def admin_create_donation():
         'donation': {
             'id': donation.id,
             'member_id': donation.member_id,
-            'amount': float(donation.amount),
+            'amount': donation.amount,
             'type': donation.type,
             'date': donation.date.isoformat() if donation.date else None
         }
@@ -71,6 +302,7 @@ def admin_create_donation():
 @admin_required()
 def admin_delete_donation(id):
     donation = Donation.query.get_or_404(id)
+    remove_donation(donation)
     db.session.delete(donation)
     db.session.commit()
     return jsonify({'message': 'Donation deleted'}), 200
@@ -82,27 +314,289 @@ def admin_update_donation(id):
     donation = Donation.query.get_or_404(id)
     data = request.get_json()
     
+    member = None
     if 'member_id' in data:
         member = Member.query.get(data['member_id'])
         if not member:
             return jsonify({'error': 'Member not found'}), 404
-        donation.member_id = data['member_id']
-    
-    donation.amount = data.get('amount', donation.amount)
-    donation.type = data.get('type', donation.type)
     
+    amount = donation.amount
+    if 'amount' in data:
+        try:
+            amount = parse_amount(data['amount'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    new_date = donation.date
     if 'date' in data:
         try:
-            donation.date = datetime.fromisoformat(data['date']).date()
+            new_date = datetime.fromisoformat(data['date']).date()
         except:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
+    # Move the old values out of the rollup before applying the edit
+    remove_donation(donation)
+    
+    if member:
+        donation.member_id = member.id
+    else:
+        member = donation.member
+    donation.amount = amount
+    donation.type = data.get('type', donation.type)
+    donation.date = new_date
+    
+    record_donation(donation, member.district_id)
     db.session.commit()
     return jsonify({'message': 'Donation updated'}), 200
 
 
+# ============== BATCH ROUTES ==============
+
+# Record a whole collection batch in one transaction (admin only)
+@donations_bp.route('/admin/batch', methods=['POST'])
+@admin_required()
+def admin_create_batch():
+    data = request.get_json() or {}
+    entries = data.get('donations')
+
+    if not data.get('date') or not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'date and a non-empty donations list are required'}), 400
+
+    try:
+        batch_date = datetime.fromisoformat(data['date']).date()
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    default_type = data.get('type', 'offering')
+
+    if not isinstance(default_type, str):
+        return jsonify({'error': 'type must be a string'}), 400
+
+    errors = []
+    rows = []
+    for index, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            errors.append({'row': index, 'error': 'Entry must be an object'})
+            continue
+        member_id = entry.get('member_id')
+        if isinstance(member_id, bool) or not isinstance(member_id, int):
+            errors.append({'row': index, 'error': 'member_id must be an integer'})
+            continue
+        donation_type = entry.get('type') or default_type
+        if not isinstance(donation_type, str):
+            errors.append({'row': index, 'error': 'type must be a string'})
+            continue
+        try:
+            amount = parse_amount(entry.get('amount'))
+        except ValueError as e:
+            errors.append({'row': index, 'error': str(e)})
+            continue
+        rows.append((index, {
+            'member_id': member_id,
+            'amount': amount,
+            'type': donation_type,
+            'date': batch_date
+        }))
+
+    # Check every member id with a single IN query
+    members = dict(
+        db.session.query(Member.id, Member.district_id)
+        .filter(Member.id.in_({r['member_id'] for _, r in rows}))
+        .all()
+    ) if rows else {}
+    for index, r in rows:
+        if r['member_id'] not in members:
+            errors.append({'row': index, 'error': 'Member not found'})
+
+    # A batch is posted as a unit: any bad envelope rejects the whole batch
+    if errors:
+        errors.sort(key=lambda e: e['row'])
+        return jsonify({'error': 'Batch rejected', 'errors': errors}), 400
+    rows = [r for _, r in rows]
+
+    batch = DonationBatch(
+        label=data.get('label'),
+        date=batch_date,
+        total=sum(r['amount'] for r in rows),
+        count=len(rows),
+        created_by=int(get_jwt_identity())
+    )
+    db.session.add(batch)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for r in rows:
+        r['batch_id'] = batch.id
+        r['created_at'] = now
+    db.session.execute(insert(Donation), rows)
+
+    # Envelopes are summed per member/type and upserted in one statement
+    adjust_rollups(
+        (r['member_id'], members[r['member_id']], r['type'], batch_date, r['amount'], 1)
+        for r in rows
+    )
+
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Batch recorded',
+        'batch': batch_serializer.dump_object(batch)
+    }), 201
+
+# List batches, newest first (admin only)
+@donations_bp.route('/admin/batch', methods=['GET'])
+@admin_required()
+def admin_list_batches():
+    try:
+        fields = batch_serializer.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    sort_columns = {'id': DonationBatch.id, 'date': DonationBatch.date}
+    query = batch_serializer.query(fields, *sort_columns.values())
+    if request.args.get('status'):
+        query = query.filter(DonationBatch.status == request.args['status'])
+
+    try:
+        query = filter_date_range(query, DonationBatch.date)
+        page = keyset_page(query, DonationBatch.id, sort_columns=sort_columns, default_sort='-id')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(batch_serializer.dump(page.items, fields), page.next_cursor), 200
+
+# Review a batch with its donations (admin only)
+@donations_bp.route('/admin/batch/<int:id>', methods=['GET'])
+@admin_required()
+def admin_get_batch(id):
+    batch = DonationBatch.query.get_or_404(id)
+
+    fields = ['id', 'member_id', 'amount', 'type']
+    donations = donation_serializer.query(fields).filter(Donation.batch_id == id).order_by(Donation.id)
+
+    result = batch_serializer.dump_object(batch)
+    result['donations'] = donation_serializer.dump(donations, fields)
+    return jsonify(result), 200
+
+# Void a batch: remove all of its donations together (admin only)
+@donations_bp.route('/admin/batch/<int:id>/void', methods=['POST'])
+@admin_required()
+def admin_void_batch(id):
+    batch = DonationBatch.query.get_or_404(id)
+    if batch.status == 'voided':
+        return jsonify({'error': 'Batch already voided'}), 400
+
+    # Take the batch's current totals back out of the rollups, grouped in SQL
+    grouped = (
+        db.session.query(
+            Donation.member_id,
+            Donation.type,
+            Donation.date,
+            func.min(Donation.created_at),
+            func.sum(Donation.amount),
+            func.count(Donation.id)
+        )
+        .filter(Donation.batch_id == id)
+        .group_by(Donation.member_id, Donation.type, Donation.date)
+        .all()
+    )
+    adjust_rollups(
+        (member_id, None, donation_type, donation_date or created_at, -amount, -count)
+        for member_id, donation_type, donation_date, created_at, amount, count in grouped
+    )
+
+    Donation.query.filter_by(batch_id=id).delete(synchronize_session=False)
+    batch.status = 'voided'
+    batch.voided_at = datetime.utcnow()
+    db.session.commit()
+
+    return jsonify({'message': 'Batch voided', 'batch': batch_serializer.dump_object(batch)}), 200
+
+
+# ============== STATEMENT ROUTES ==============
+
+# Start generating every member's giving statement for a year (admin only)
+@donations_bp.route('/admin/statements/<int:year>', methods=['POST'])
+@admin_required()
+def admin_start_statements(year):
+    try:
+        check_statement_year(year)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    data = request.get_json(silent=True) or {}
+    workers = data.get('workers')
+    if workers is not None and (not isinstance(workers, int) or not 0 <= workers <= 32):
+        return jsonify({'error': 'workers must be an integer between 0 and 32'}), 400
+
+    # One run per year at a time: queued or running in the job queue, or a CLI run
+    if is_running(year) or active_statement_job(year):
+        return jsonify({'error': f'Statements for {year} are already being generated'}), 409
+
+    # resume (default) keeps statements already written and only renders the rest
+    job = enqueue('generate-statements', {
+        'year': year,
+        'workers': workers,
+        'resume': data.get('resume', True) is not False
+    }, created_by=int(get_jwt_identity()))
+
+    response = jsonify({'message': f'Generating statements for {year}', 'job_id': job.id})
+    response.headers['Location'] = url_for('donations.admin_statement_progress', year=year)
+    return response, 202
+
+# Progress of the latest statement run for a year (admin only)
+@donations_bp.route('/admin/statements/<int:year>', methods=['GET'])
+@admin_required()
+def admin_statement_progress(year):
+    progress = read_progress(year)
+    job_id = active_statement_job(year)
+    if progress is None or (job_id and progress['status'] != 'running'):
+        if job_id:
+            return jsonify({'year': year, 'status': 'queued', 'job_id': job_id}), 200
+        return jsonify({'error': f'No statements generated for {year}'}), 404
+    progress['files'] = len(statement_files(year))
+    return jsonify(progress), 200
+
+# Download a year's statements as a streamed ZIP (admin only)
+@donations_bp.route('/admin/statements/<int:year>/download', methods=['GET'])
+@admin_required()
+def admin_download_statements(year):
+    if is_running(year):
+        return jsonify({'error': f'Statements for {year} are still being generated'}), 409
+    if not statement_files(year):
+        return jsonify({'error': f'No statements generated for {year}'}), 404
+
+    return Response(
+        stream_with_context(iter_zip(year)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=statements-{year}.zip'}
+    )
+
+
 # ============== USER ROUTES ==============
 
+# Current user's giving statement for a year, rendered on demand
+@donations_bp.route('/my-statement/<int:year>', methods=['GET'])
+@jwt_required()
+def get_my_statement(year):
+    try:
+        check_statement_year(year)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    user = User.query.get(int(get_jwt_identity()))
+    if not user or not user.member:
+        return jsonify({'error': 'No member profile linked to this user'}), 404
+
+    rows = giving_query(year).filter(Member.id == user.member.id).all()
+    statement = next(iter_statements(rows), None)
+    if statement is None:
+        return jsonify({'error': f'No donations recorded in {year}'}), 404
+
+    html = render_statement(statement, year, parish_name(), datetime.utcnow().date().isoformat())
+    return Response(html, mimetype='text/html')
+
+
 # Get current user's donations (via their member record)
 @donations_bp.route('/my-donations', methods=['GET'])
 @jwt_required()
@@ -114,16 +608,19 @@ def get_my_donations():
     if not user or not user.member:
         return jsonify([]), 200
     
+    try:
+        fields = donation_serializer.requested(default=['id', 'amount', 'type', 'date', 'created_at'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     # Filter by member_id to get historical data
-    donations = Donation.query.filter_by(member_id=user.member.id).order_by(Donation.date.desc()).all()
-    
-    return jsonify([{
-        'id': d.id,
-        'amount': float(d.amount),
-        'type': d.type,
-        'date': d.date.isoformat() if d.date else None,
-        'created_at': d.created_at.isoformat() if d.created_at else None
-    } for d in donations]), 200
+    donations = (
+        donation_serializer.query(fields)
+        .filter(Donation.member_id == user.member.id)
+        .order_by(Donation.date.desc())
+    )
+
+    return jsonify(donation_serializer.dump(donations, fields)), 200
 
 # Create donation for current user
 @donations_bp.route('/', methods=['POST'])
@@ -135,6 +632,11 @@ def create_donation():
     
     if not data.get('amount') or not data.get('type'):
         return jsonify({'error': 'amount and type are required'}), 400
+
+    try:
+        amount = parse_amount(data['amount'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Find the member associated with this user
     user = User.query.get(user_id)
@@ -156,19 +658,20 @@ def create_donation():
     
     donation = Donation(
         member_id=member.id,
-        amount=data['amount'],
+        amount=amount,
         type=data.get('type', 'tithe'),
         date=donation_date
     )
     
     db.session.add(donation)
+    record_donation(donation, member.district_id)
     db.session.commit()
     
     return jsonify({
         'message': 'Donation created successfully',
         'donation': {
             'id': donation.id,
-            'amount': float(donation.amount),
+            'amount': donation.amount,
             'type': donation.type,
             'date': donation.date.isoformat() if donation.date else None
         }
@@ -188,6 +691,7 @@ def delete_donation(id):
     member = user.member
     
     donation = Donation.query.filter_by(id=id, member_id=member.id).first_or_404()
+    remove_donation(donation)
     db.session.delete(donation)
     db.session.commit()
     return jsonify({'message': 'Donation deleted'}), 200
\ No newline at end of file
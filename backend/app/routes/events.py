@@ -1,12 +1,94 @@
+import heapq
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import or_
 from app.extensions import db
-from app.models import Event
-from datetime import datetime
+from app.models import Event, EventSeries
+from datetime import date, datetime
 from app.utils.roles import admin_required
+from app.utils.pagination import keyset_page, page_response, filter_date_range, parse_date_arg
+from app.utils.caching import conditional
+from app.utils.serializers import event_serializer, event_series_serializer
+from app.utils.recurrence import parse_rrule, format_rrule, occurrences, last_occurrence
 
 events_bp = Blueprint('events', __name__, url_prefix='/events')
 
+# Longest window one calendar request may expand
+MAX_CALENDAR_DAYS = 366
+
+
+def apply_series_fields(series, data):
+    """
+    Validate and copy name, description, rrule, start_date and exdates from a
+    request body onto a series, recomputing its last date. Raises ValueError.
+    """
+    if 'name' in data:
+        if not isinstance(data['name'], str):
+            raise ValueError('name must be a string')
+        series.name = data['name'].strip()
+    if 'description' in data:
+        if data['description'] is not None and not isinstance(data['description'], str):
+            raise ValueError('description must be a string')
+        series.description = data['description']
+    if not series.name:
+        raise ValueError('name is required')
+
+    if 'start_date' in data:
+        try:
+            series.start_date = date.fromisoformat(data['start_date'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid start_date. Use YYYY-MM-DD')
+    if series.start_date is None:
+        raise ValueError('start_date is required')
+
+    if 'exdates' in data:
+        exdates = data['exdates'] or []
+        try:
+            if not isinstance(exdates, list):
+                raise TypeError
+            series.exdates = sorted({date.fromisoformat(d).isoformat() for d in exdates})
+        except (TypeError, ValueError):
+            raise ValueError('exdates must be a list of YYYY-MM-DD dates')
+
+    rule = parse_rrule(data.get('rrule', series.rrule))
+    if next(occurrences(rule, series.start_date), None) is None:
+        raise ValueError('rrule never matches a date from start_date')
+    series.rrule = format_rrule(rule)
+    series.end_date = last_occurrence(rule, series.start_date)
+
+
+def calendar_entries(date_from, date_to):
+    """
+    One-off events and series occurrences in [date_from, date_to], merged
+    in date order. Series are expanded lazily, only across the window.
+    """
+    one_offs = (
+        {'id': row.id, 'series_id': None, 'name': row.name, 'description': row.description, 'date': row.date}
+        for row in (
+            db.session.query(Event.id, Event.name, Event.description, Event.date)
+            .filter(Event.date >= date_from, Event.date <= date_to)
+            .order_by(Event.date, Event.id)
+        )
+    )
+
+    # Only series whose span overlaps the window, via ix_event_series_start_end
+    series = (
+        EventSeries.query
+        .filter(
+            EventSeries.start_date <= date_to,
+            or_(EventSeries.end_date.is_(None), EventSeries.end_date >= date_from)
+        )
+        .order_by(EventSeries.start_date, EventSeries.id)
+        .all()
+    )
+
+    def expand(s):
+        exdates = {date.fromisoformat(d) for d in s.exdates or []}
+        for day in occurrences(parse_rrule(s.rrule), s.start_date, date_from, date_to, exdates):
+            yield {'id': None, 'series_id': s.id, 'name': s.name, 'description': s.description, 'date': day}
+
+    return heapq.merge(one_offs, *[expand(s) for s in series], key=lambda e: e['date'])
+
 # OPTIONS handler
 @events_bp.route('/<path:path>', methods=['OPTIONS'])
 @events_bp.route('/', methods=['OPTIONS'], defaults={'path': ''})
@@ -16,16 +98,96 @@ def handle_options(path):
 # Get all events
 @events_bp.route('/', methods=['GET'], strict_slashes=False)
 @jwt_required()
+@conditional('events')
 def get_events():
-    events = Event.query.order_by(Event.date.desc()).all()
-    
-    return jsonify([{
-        'id': e.id,
-        'name': e.name,
-        'description': e.description,
-        'date': e.date.isoformat() if e.date else None,
-        'created_at': e.created_at.isoformat() if e.created_at else None
-    } for e in events]), 200
+    try:
+        fields = event_serializer.requested()
+        sort_columns = {'id': Event.id, 'date': Event.date, 'name': Event.name}
+        query = filter_date_range(event_serializer.query(fields, *sort_columns.values()), Event.date)
+        page = keyset_page(query, Event.id, sort_columns=sort_columns, default_sort='-date')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(event_serializer.dump(page.items, fields), page.next_cursor), 200
+
+# Calendar view: one-off events plus recurring occurrences for a date window
+@events_bp.route('/calendar', methods=['GET'])
+@jwt_required()
+@conditional('events')
+def get_calendar():
+    try:
+        date_from = parse_date_arg('date_from')
+        date_to = parse_date_arg('date_to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not date_from or not date_to:
+        return jsonify({'error': 'date_from and date_to are required'}), 400
+    if date_to < date_from:
+        return jsonify({'error': 'date_to must not be before date_from'}), 400
+    if (date_to - date_from).days >= MAX_CALENDAR_DAYS:
+        return jsonify({'error': f'The window can span at most {MAX_CALENDAR_DAYS} days'}), 400
+
+    return jsonify(list(calendar_entries(date_from, date_to))), 200
+
+# ---------------- RECURRING SERIES ----------------
+
+# List recurring series
+@events_bp.route('/series', methods=['GET'])
+@jwt_required()
+@conditional('events')
+def get_series():
+    try:
+        fields = event_series_serializer.requested()
+        sort_columns = {'id': EventSeries.id, 'start_date': EventSeries.start_date, 'name': EventSeries.name}
+        query = event_series_serializer.query(fields, *sort_columns.values())
+        page = keyset_page(query, EventSeries.id, sort_columns=sort_columns, default_sort='id')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(event_series_serializer.dump(page.items, fields), page.next_cursor), 200
+
+# Create a recurring series, e.g. {"rrule": "FREQ=WEEKLY;BYDAY=SU"} (admin only)
+@events_bp.route('/series', methods=['POST'])
+@admin_required()
+def create_series():
+    data = request.get_json() or {}
+
+    series = EventSeries(description=data.get('description', ''))
+    try:
+        apply_series_fields(series, data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db.session.add(series)
+    db.session.commit()
+
+    return jsonify({'message': 'Series created', 'series': event_series_serializer.dump_object(series)}), 201
+
+# Update a series; send exdates to skip single occurrences (admin only)
+@events_bp.route('/series/<int:id>', methods=['PUT'])
+@admin_required()
+def update_series(id):
+    series = EventSeries.query.get_or_404(id)
+    data = request.get_json() or {}
+
+    try:
+        apply_series_fields(series, data)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+    db.session.commit()
+    return jsonify({'message': 'Series updated', 'series': event_series_serializer.dump_object(series)}), 200
+
+# Delete a series and all its occurrences (admin only)
+@events_bp.route('/series/<int:id>', methods=['DELETE'])
+@admin_required()
+def delete_series(id):
+    series = EventSeries.query.get_or_404(id)
+    db.session.delete(series)
+    db.session.commit()
+    return jsonify({'message': 'Series deleted'}), 200
 
 # Create event (admin only)
 @events_bp.route('/', methods=['POST'])
@@ -1,37 +1,338 @@
-import secrets
+import csv
+import io
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import db
-from app.models import Member
-from app.utils.roles import admin_required
-from datetime import datetime, timedelta
+from app.models import Member, District, Donation, DonationRollup
+from app.utils.roles import admin_required, get_current_role
+from app.utils.pagination import keyset_page, page_response, get_limit, encode_cursor, decode_cursor
+from app.utils.search import parse_terms, prefix_search, fuzzy_search
+from app.utils.caching import conditional
+from app.utils.claim_codes import CLAIM_CODE_TTL, new_claim_code, purge_expired_codes
+from app.utils.serializers import (
+    member_serializer, district_serializer, sacrament_serializer, donation_serializer
+)
+from datetime import datetime
+from decimal import Decimal
 
 
 members_bp = Blueprint('members', __name__, url_prefix='/members')
 
+IMPORT_BATCH_SIZE = 1000
+MEMBER_STATUSES = ('active', 'inactive')
+SEARCH_MODES = ('auto', 'prefix', 'fuzzy')
+PROFILE_RECENT_DONATIONS = 10
+MAX_PROFILE_RECENT_DONATIONS = 100
+
+def filter_members(query):
+    """
+    Apply the shared ?status, ?district_id and ?family filters.
+    """
+    if request.args.get('status'):
+        query = query.filter(Member.status == request.args['status'])
+    if request.args.get('district_id'):
+        query = query.filter(Member.district_id == request.args.get('district_id', type=int))
+    if request.args.get('family'):
+        query = query.filter(Member.family == request.args['family'])
+    return query
+
+def row_text(row, key, default=''):
+    """
+    A text field of an import row, stripped, or `default` when missing or
+    blank. Raises ValueError for non-string values (e.g. JSON numbers).
+    """
+    value = row.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f'{key} must be a string')
+    return value.strip() or default
+
+def import_member_rows(rows, progress=None):
+    """
+    Validate and insert member rows (dicts from CSV or JSON). Returns the
+    created members with their one-time claim codes, and per-row errors.
+    `progress(done, total)` is called after each committed chunk.
+    """
+    # Resolve every district name in the upload with one query
+    district_names = {
+        r['district'].strip()
+        for r in rows if isinstance(r, dict) and isinstance(r.get('district'), str)
+    }
+    district_ids = {}
+    if district_names:
+        district_ids = dict(
+            db.session.query(District.name, District.id)
+            .filter(District.name.in_(district_names))
+            .all()
+        )
+
+    errors = []
+    valid = []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'error': 'Row must be an object'})
+            continue
+
+        try:
+            name = row_text(row, 'name')
+            status = row_text(row, 'status', 'active').lower()
+            district_name = row_text(row, 'district')
+            optional = {key: row_text(row, key, None) for key in ('contact', 'address', 'family')}
+        except ValueError as e:
+            errors.append({'row': index, 'error': str(e)})
+            continue
+
+        if not name:
+            errors.append({'row': index, 'error': 'name is required'})
+            continue
+
+        if status not in MEMBER_STATUSES:
+            errors.append({'row': index, 'error': f'Invalid status: {status}'})
+            continue
+
+        district_id = None
+        if district_name:
+            district_id = district_ids.get(district_name)
+            if district_id is None:
+                errors.append({'row': index, 'error': f'Unknown district: {district_name}'})
+                continue
+        elif row.get('district_id'):
+            try:
+                district_id = int(row['district_id'])
+            except (ValueError, TypeError):
+                errors.append({'row': index, 'error': 'district_id must be an integer'})
+                continue
+
+        valid.append((index, {
+            'name': name,
+            **optional,
+            'status': status,
+            'district_id': district_id
+        }))
+
+    # Explicit district ids are checked together so one bad row can't fail a chunk
+    requested_ids = {v['district_id'] for _, v in valid if v['district_id'] is not None}
+    if requested_ids:
+        known_ids = {
+            d for (d,) in db.session.query(District.id).filter(District.id.in_(requested_ids))
+        }
+        checked = []
+        for index, values in valid:
+            if values['district_id'] is not None and values['district_id'] not in known_ids:
+                errors.append({'row': index, 'error': f"Unknown district_id: {values['district_id']}"})
+            else:
+                checked.append((index, values))
+        valid = checked
+
+    now = datetime.utcnow()
+    expires_at = now + CLAIM_CODE_TTL
+    created = []
+
+    # One executemany INSERT and one commit per chunk
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        chunk = valid[start:start + IMPORT_BATCH_SIZE]
+        params = []
+        for _, values in chunk:
+            params.append(dict(
+                values,
+                claim_code=new_claim_code(),
+                claim_code_expires_at=expires_at,
+                created_at=now
+            ))
+
+        try:
+            db.session.execute(insert(Member), params)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for index, _ in chunk:
+                errors.append({'row': index, 'error': f'Insert failed: {e.__class__.__name__}'})
+            continue
+
+        codes = [p['claim_code'] for p in params]
+        ids = dict(
+            db.session.query(Member.claim_code, Member.id)
+            .filter(Member.claim_code.in_(codes))
+            .all()
+        )
+        for (index, values), p in zip(chunk, params):
+            created.append({
+                'row': index,
+                'id': ids.get(p['claim_code']),
+                'name': values['name'],
+                'claim_code': p['claim_code']  # show ONCE
+            })
+        if progress:
+            progress(start + len(chunk), len(valid))
+
+    errors.sort(key=lambda e: e['row'])
+    return created, errors
+
 # Get all members
 @members_bp.route('/', methods=['GET'])
+@conditional('members')
 def get_members():
-    members = Member.query.all()
-    return jsonify([{
-        'id': m.id,
-        'name': m.name,
-        'contact': m.contact,
-        'address': m.address,
-        'family': m.family,
-        'status': m.status
-    } for m in members])
+    try:
+        fields = member_serializer.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    sort_columns = {'id': Member.id, 'name': Member.name, 'created_at': Member.created_at}
+    query = filter_members(member_serializer.query(fields, *sort_columns.values()))
+
+    try:
+        page = keyset_page(query, Member.id, sort_columns=sort_columns, default_sort='id')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(member_serializer.dump(page.items, fields), page.next_cursor)
+
+# Search members by name, family or contact
+@members_bp.route('/search', methods=['GET'])
+@conditional('members')
+def search_members():
+    mode = request.args.get('mode', 'auto')
+    if mode not in SEARCH_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+
+    try:
+        terms = parse_terms(request.args.get('q'))
+        fields = member_serializer.requested()
+        limit = get_limit()
+
+        # Ranked results page by offset; the cursor pins the query and the
+        # mode actually used, so an auto search that fell back stays fuzzy
+        offset = 0
+        key = ' '.join(terms)
+        if request.args.get('cursor'):
+            cursor_key, offset, _ = decode_cursor(request.args['cursor'])
+            if not isinstance(cursor_key, str) or isinstance(offset, bool) or not isinstance(offset, int):
+                raise ValueError('Invalid cursor')
+            mode, _, cursor_terms = cursor_key.partition(':')
+            if cursor_terms != key or mode not in ('prefix', 'fuzzy') or offset < 0:
+                raise ValueError('Cursor does not match this search')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    dialect = db.engine.dialect.name
+    query = filter_members(member_serializer.query(fields, Member.id))
+
+    # auto tries word-prefix matches first and falls back to fuzzy if none
+    rows = []
+    if mode != 'fuzzy':
+        rows = prefix_search(query, terms, dialect, offset, limit)
+        if mode == 'auto':
+            mode = 'prefix' if rows else 'fuzzy'
+    if mode == 'fuzzy':
+        rows = fuzzy_search(query, terms, dialect, offset, limit)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(f'{mode}:{key}', offset + limit, 0)
+
+    response = page_response(member_serializer.dump(rows, fields), next_cursor)
+    response.headers['X-Search-Mode'] = mode
+    return response
 
 # Get single member
 @members_bp.route('/<int:id>', methods=['GET'])
 def get_member(id):
-    m = Member.query.get_or_404(id)
+    try:
+        fields = member_serializer.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    row = member_serializer.query(fields).filter(Member.id == id).first_or_404()
+    return jsonify(dict(zip(fields, row)))
+
+# Full member profile: member, district, linked user, sacraments and giving
+# summary in four statements however much history the member has
+@members_bp.route('/<int:id>/profile', methods=['GET'])
+@jwt_required()
+def get_member_profile(id):
+    recent = request.args.get('recent', PROFILE_RECENT_DONATIONS, type=int)
+    if recent is None or not 0 <= recent <= MAX_PROFILE_RECENT_DONATIONS:
+        return jsonify({'error': f'recent must be between 0 and {MAX_PROFILE_RECENT_DONATIONS}'}), 400
+
+    try:
+        user_id = int(get_jwt_identity())
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid user ID'}), 400
+
+    # 1: member with district and user joined in; 2: sacraments in one IN query
+    member = (
+        Member.query
+        .options(
+            joinedload(Member.district),
+            joinedload(Member.user),
+            selectinload(Member.sacraments)
+        )
+        .filter(Member.id == id)
+        .first_or_404()
+    )
+
+    # Admins see anyone; members only the record linked to their account
+    if member.user_id != user_id and get_current_role(user_id) != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+
+    # 3: totals by year and type from the monthly rollup
+    year = func.extract('year', DonationRollup.month).label('year')
+    totals = (
+        db.session.query(
+            year,
+            DonationRollup.type,
+            func.sum(DonationRollup.total).label('total'),
+            func.sum(DonationRollup.count).label('count')
+        )
+        .filter(DonationRollup.member_id == id)
+        .group_by(year, DonationRollup.type)
+        .order_by(year.desc(), DonationRollup.type)
+        .all()
+    )
+
+    by_year = {}
+    for row in totals:
+        entry = by_year.setdefault(
+            int(row.year), {'year': int(row.year), 'total': Decimal('0.00'), 'count': 0, 'by_type': {}}
+        )
+        entry['by_type'][row.type] = {'total': row.total, 'count': int(row.count or 0)}
+        entry['total'] += row.total
+        entry['count'] += int(row.count or 0)
+
+    # 4: the latest donations, read backwards along ix_donation_member_date
+    recent_fields = ['id', 'amount', 'type', 'date', 'batch_id']
+    recent_rows = []
+    if recent:
+        recent_rows = (
+            donation_serializer.query(recent_fields)
+            .filter(Donation.member_id == id)
+            .order_by(Donation.date.desc(), Donation.id.desc())
+            .limit(recent)
+            .all()
+        )
+
+    sacraments = sorted(member.sacraments, key=lambda s: (s.date is None, s.date, s.id))
+    user = member.user
+
     return jsonify({
-        'id': m.id,
-        'name': m.name,
-        'contact': m.contact,
-        'address': m.address,
-        'family': m.family,
-        'status': m.status
+        'member': member_serializer.dump_object(member, list(member_serializer.fields)),
+        'district': district_serializer.dump_object(
+            member.district, ['id', 'name', 'leader_name', 'description']
+        ) if member.district else None,
+        'user': {
+            'id': user.id, 'name': user.name, 'email': user.email, 'role': user.role
+        } if user else None,
+        'sacraments': [sacrament_serializer.dump_object(s) for s in sacraments],
+        'donations': {
+            'total': sum((y['total'] for y in by_year.values()), Decimal('0.00')),
+            'count': sum(y['count'] for y in by_year.values()),
+            'by_year': list(by_year.values()),
+            'recent': donation_serializer.dump(recent_rows, recent_fields)
+        }
     })
 
 # Create member
@@ -40,7 +341,7 @@ def get_member(id):
 def create_member():
     data = request.json
 
-    claim_code = secrets.token_urlsafe(12)
+    claim_code = new_claim_code()
 
     member = Member(
         name=data.get('name'),
@@ -49,7 +350,7 @@ def create_member():
         family=data.get('family'),
         status=data.get('status', 'active'),
         claim_code=claim_code,
-        claim_code_expires_at=datetime.utcnow() + timedelta(days=30)
+        claim_code_expires_at=datetime.utcnow() + CLAIM_CODE_TTL
     )
 
     db.session.add(member)
@@ -61,6 +362,36 @@ def create_member():
         'claim_code': claim_code  # show ONCE
     }), 201
 
+# Bulk import members from CSV or a JSON array (admin only)
+@members_bp.route('/import', methods=['POST'])
+@admin_required()
+def import_members():
+    if 'file' in request.files:
+        text = request.files['file'].read().decode('utf-8-sig')
+        rows = list(csv.DictReader(io.StringIO(text)))
+    elif request.mimetype == 'text/csv':
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        rows = request.get_json(silent=True)
+        if isinstance(rows, dict):
+            rows = rows.get('members')
+        if not isinstance(rows, list):
+            return jsonify({'error': 'Send a CSV file or a JSON array of members'}), 400
+
+    created, errors = import_member_rows(rows)
+    return jsonify({
+        'message': f'Imported {len(created)} of {len(rows)} members',
+        'created': created,
+        'errors': errors
+    }), 201 if created else 400
+
+# Clear expired claim codes, parish-wide or for one ?district_id (admin only)
+@members_bp.route('/claim-codes/purge', methods=['POST'])
+@admin_required()
+def purge_claim_codes():
+    purged = purge_expired_codes(request.args.get('district_id', type=int))
+    return jsonify({'message': f'Purged {purged} expired claim codes', 'purged': purged})
+
 # Update member
 @members_bp.route('/<int:id>', methods=['PUT'])
 def update_member(id):
@@ -0,0 +1,28 @@
+import hmac
+import os
+from flask import Blueprint, Response, jsonify, request
+from app.utils.metrics import registry, register_sql_hooks, start_request_timer, record_request
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.record_once
+def setup(state):
+    register_sql_hooks()
+
+
+metrics_bp.before_app_request(start_request_timer)
+metrics_bp.after_app_request(record_request)
+
+
+# ---------------- PROMETHEUS SCRAPE ----------------
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    # Optional shared secret for scrapers: Authorization: Bearer <METRICS_TOKEN>
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied, token):
+            return jsonify({"error": "Invalid metrics token"}), 401
+
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import Sacrament, Member, User
 from datetime import datetime
 from app.utils.roles import admin_required
+from app.utils.pagination import keyset_page, page_response, filter_date_range
+from app.utils.serializers import sacrament_serializer
 
 sacraments_bp = Blueprint('sacraments', __name__, url_prefix='/sacraments')
 
@@ -14,26 +16,35 @@ sacraments_bp = Blueprint('sacraments', __name__, url_prefix='/sacraments')
 @admin_required()
 def get_all_sacraments():
     try:
-        sacraments = Sacrament.query.all()
-        return jsonify([
-            {
-                "id": s.id,
-                "user_id": s.user_id,
-                "member_id": s.member_id,
-                "type": s.type,
-                "date": s.date.isoformat() if s.date else None,
-                "certificate_path": s.certificate_path
-            } for s in sacraments
-        ]), 200
+        fields = sacrament_serializer.requested()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        sort_columns = {"id": Sacrament.id, "date": Sacrament.date}
+        query = sacrament_serializer.query(fields, *sort_columns.values())
+
+        if request.args.get("member_id"):
+            query = query.filter(Sacrament.member_id == request.args.get("member_id", type=int))
+        if request.args.get("type"):
+            query = query.filter(Sacrament.type == request.args["type"])
+        if request.args.get("district_id"):
+            query = query.join(Member).filter(Member.district_id == request.args.get("district_id", type=int))
+
+        try:
+            query = filter_date_range(query, Sacrament.date)
+            page = keyset_page(query, Sacrament.id, sort_columns=sort_columns, default_sort="id")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return page_response(sacrament_serializer.dump(page.items, fields), page.next_cursor), 200
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception("Failed to list sacraments")
         return jsonify({"error": str(e)}), 500
 
 @sacraments_bp.route("/admin/add", methods=["POST"], strict_slashes=False)
 @admin_required()
 def admin_create_sacrament():
-    print("DEBUG: admin_create_sacrament called") # Debug print
     data = request.get_json()
     user_id = data.get("user_id")
     sacrament_type = data.get("type")
@@ -45,11 +56,11 @@ def admin_create_sacrament():
 
     user = User.query.get(user_id)
     if not user:
-        print(f"DEBUG: User {user_id} not found")
+        current_app.logger.debug("admin_create_sacrament: user %s not found", user_id)
         return jsonify({"error": "User not found"}), 404
 
     if not user.member:
-        print(f"DEBUG: User {user_id} has no member")
+        current_app.logger.debug("admin_create_sacrament: user %s has no member", user_id)
         return jsonify({"error": "This user has no linked member profile"}), 404
 
     if sacrament_date:
@@ -71,14 +82,7 @@ def admin_create_sacrament():
 
     return jsonify({
         "message": "Sacrament added",
-        "sacrament": {
-            "id": sacrament.id,
-            "user_id": sacrament.user_id,
-            "member_id": sacrament.member_id,
-            "type": sacrament.type,
-            "date": sacrament.date.isoformat() if sacrament.date else None,
-            "certificate_path": sacrament.certificate_path
-        }
+        "sacrament": sacrament_serializer.dump_object(sacrament)
     }), 201
 
 @sacraments_bp.route("/admin/<int:id>", methods=["DELETE"], strict_slashes=False)
@@ -100,15 +104,13 @@ def get_my_sacraments():
     if not user or not user.member:
         return jsonify([]), 200
 
+    try:
+        fields = sacrament_serializer.requested(default=["id", "type", "date", "certificate_path"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # Filter by member_id to get all history for this member
-    sacraments = Sacrament.query.filter_by(member_id=user.member.id).all()
-    
-    return jsonify([
-        {
-            "id": s.id,
-            "type": s.type,
-            "date": s.date.isoformat() if s.date else None,
-            "certificate_path": s.certificate_path
-        } for s in sacraments
-    ]), 200
+    sacraments = sacrament_serializer.query(fields).filter(Sacrament.member_id == user.member.id)
+
+    return jsonify(sacrament_serializer.dump(sacraments, fields)), 200
 
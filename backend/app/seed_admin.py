@@ -1,5 +1,5 @@
 from app.models import db, User
-from werkzeug.security import generate_password_hash
+from app.utils.passwords import hash_password
 import os
 
 def create_admin():
@@ -20,7 +20,7 @@ def create_admin():
         name="Administrator",
         email=admin_email,
         role="admin",
-        password_hash=generate_password_hash(admin_password) 
+        password_hash=hash_password(admin_password)
     )
 
     try:
@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from flask import make_response, request
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import CollectionVersion
+
+# Table name -> collections whose responses change when that table is written.
+# District listings include member counts, so member writes bump both. (The
+# "roles" version is bumped by roles.py, only when a role actually changes.)
+TRACKED_TABLES = {
+    "member": ("members", "districts"),
+    "district": ("districts",),
+    "event": ("events",),
+    "event_series": ("events",),
+    "announcement": ("announcements",),
+}
+
+
+class TTLCache:
+    """
+    Tiny thread-safe in-process cache whose entries expire after `ttl` seconds.
+    With `max_entries`, a full cache drops expired entries and then the
+    oldest ones to make room.
+    """
+
+    def __init__(self, ttl, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.monotonic()
+            self._entries.pop(key, None)
+            if self.max_entries and len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order, so the first keys are the oldest
+                for stale in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                    del self._entries[stale]
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (value, now + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_version(name):
+    """
+    (version, updated_at) for a collection, or (0, None) if never written.
+    """
+    row = db.session.query(
+        CollectionVersion.version, CollectionVersion.updated_at
+    ).filter_by(name=name).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def _bump(connection, names):
+    table = CollectionVersion.__table__
+    now = datetime.utcnow()
+    for name in sorted(names):
+        result = connection.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1, updated_at=now))
+
+
+def _collections_for(tables):
+    names = set()
+    for table in tables:
+        names.update(TRACKED_TABLES.get(table, ()))
+    return names
+
+
+def bump_versions(connection, names):
+    """
+    Bump the named collection versions inside the connection's transaction.
+    """
+    _bump(connection, set(names))
+
+
+def bump_tables(connection, tables):
+    """
+    Bump collection versions for Core writes that bypass the session events.
+    """
+    names = _collections_for(tables)
+    if names:
+        _bump(connection, names)
+
+
+def _before_flush(session, flush_context, instances):
+    tables = set()
+    for obj in list(session.new) + list(session.deleted):
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+
+    names = _collections_for(tables)
+    if names:
+        _bump(session.connection(), names)
+
+
+def _do_orm_execute(state):
+    # Bulk INSERT/UPDATE/DELETE statements skip the flush, so catch them here
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    if mapper is None:
+        return
+
+    names = _collections_for([mapper.local_table.name])
+    if names:
+        _bump(state.session.connection(), names)
+
+
+def register_version_tracking():
+    """
+    Bump collection versions in the same transaction as any write to them.
+    """
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+def conditional(name):
+    """
+    Decorator adding ETag / Last-Modified validators to a collection GET.
+
+    A matching If-None-Match (or an up-to-date If-Modified-Since) is answered
+    with 304 after a single primary-key lookup, before the route queries or
+    serializes anything.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            version, updated_at = get_version(name)
+
+            # The body also depends on filters / cursor, so they're part of the tag
+            args_hash = hashlib.sha1(request.query_string).hexdigest()[:12]
+            etag = f"{name}-{version}-{args_hash}"
+
+            last_modified = updated_at.replace(microsecond=0) if updated_at else None
+
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif last_modified and request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since.replace(tzinfo=None)
+
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return decorator
+    return wrapper
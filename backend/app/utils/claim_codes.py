@@ -0,0 +1,172 @@
+import secrets
+from datetime import datetime, timedelta
+from jinja2 import Environment
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Member
+
+CLAIM_CODE_TTL = timedelta(days=30)
+MAX_CLAIM_CODE_TTL_DAYS = 365
+# A 64-bit code colliding during a bulk update is vanishingly rare; retry anyway
+CLAIM_CODE_RETRIES = 3
+
+SHEET_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Claim codes - {{ district.name }}</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; margin: 1.5em; color: #222; }
+.sheet { display: grid; grid-template-columns: repeat(3, 1fr); gap: .6em; }
+.card { border: 1px dashed #888; padding: .8em; break-inside: avoid; }
+.code { font-family: "Courier New", monospace; font-size: 1.3em; letter-spacing: .08em; margin: .4em 0; }
+.meta { font-size: .8em; color: #555; }
+@media print { body { margin: 0; } h1 { font-size: 1.2em; } }
+</style>
+</head>
+<body>
+<h1>{{ district.name }}: member claim codes ({{ rows|length }})</h1>
+<p class="meta">Register in the parish app with your code to link your member profile. Printed {{ printed }}.</p>
+<div class="sheet">
+{% for row in rows %}
+<div class="card">
+<strong>{{ row.name }}</strong>{% if row.family %} <span class="meta">({{ row.family }})</span>{% endif %}
+<div class="code">{{ row.claim_code }}</div>
+<div class="meta">Member no. {{ row.id }}{% if row.claim_code_expires_at %} &middot; valid until {{ row.claim_code_expires_at.strftime("%Y-%m-%d") }}{% endif %}</div>
+</div>
+{% endfor %}
+</div>
+</body>
+</html>
+"""
+
+_sheet_template = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(SHEET_TEMPLATE)
+
+
+def new_claim_code():
+    return secrets.token_urlsafe(12)
+
+
+def _random_code():
+    # Generated per row inside the UPDATE, 16 hex characters (64 bits)
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.substr(func.md5(func.cast(func.gen_random_uuid(), db.Text)), 1, 16)
+    return func.lower(func.hex(func.randomblob(8)))
+
+
+def _expired(now):
+    return Member.claim_code_expires_at < now
+
+
+# ---------------- LOOKUP / CLAIM ----------------
+
+def find_claim_code(code):
+    """
+    (member_id, user_id, expires_at) for a claim code, or None. Reads only
+    ix_member_claim_code_lookup, never the member row. SQLite prefers the
+    unique index on claim_code plus a row fetch, so it's told which to use.
+    """
+    hint = ""
+    if db.session.get_bind().dialect.name == "sqlite":
+        hint = "INDEXED BY ix_member_claim_code_lookup"
+    stmt = db.text(
+        f"SELECT id, user_id, claim_code_expires_at FROM member {hint} WHERE claim_code = :code"
+    ).columns(id=db.Integer, user_id=db.Integer, claim_code_expires_at=db.DateTime)
+    return db.session.execute(stmt, {"code": code}).first()
+
+
+def check_claim_code(code):
+    """
+    Member id for a usable claim code; raises ValueError saying why not.
+    """
+    found = find_claim_code(code)
+    if found is None:
+        raise ValueError("Invalid claim code")
+    if found.user_id:
+        raise ValueError("Member already linked")
+    if found.claim_code_expires_at and found.claim_code_expires_at < datetime.utcnow():
+        raise ValueError("Claim code expired")
+    return found.id
+
+
+def claim_member(code, user_id):
+    """
+    Link the member holding `code` to `user_id` and spend the code, in one
+    conditional UPDATE so two sign-ups can't both use it. Runs in the
+    caller's transaction; returns False if the code was no longer usable.
+    """
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(Member)
+        .where(
+            Member.claim_code == code,
+            Member.user_id.is_(None),
+            or_(Member.claim_code_expires_at.is_(None), Member.claim_code_expires_at >= now)
+        )
+        .values(user_id=user_id, claim_code=None, claim_code_expires_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return claimed == 1
+
+
+# ---------------- BULK OPERATIONS ----------------
+
+def regenerate_district_codes(district_id, ttl=CLAIM_CODE_TTL, only_missing=False):
+    """
+    Issue fresh codes to every unlinked member of a district in a single
+    UPDATE. With `only_missing`, members holding a still-valid code keep it.
+    Returns (members updated, new expiry).
+    """
+    now = datetime.utcnow()
+    expires_at = now + ttl
+    stmt = update(Member).where(Member.district_id == district_id, Member.user_id.is_(None))
+    if only_missing:
+        stmt = stmt.where(or_(Member.claim_code.is_(None), _expired(now)))
+    stmt = stmt.values(claim_code=_random_code(), claim_code_expires_at=expires_at)
+    stmt = stmt.execution_options(synchronize_session=False)
+
+    for attempt in range(CLAIM_CODE_RETRIES):
+        try:
+            updated = db.session.execute(stmt).rowcount
+            db.session.commit()
+            return updated, expires_at
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == CLAIM_CODE_RETRIES - 1:
+                raise
+
+
+def purge_expired_codes(district_id=None):
+    """
+    Clear every expired claim code (optionally in one district) in a single
+    UPDATE. Returns how many were removed.
+    """
+    stmt = update(Member).where(_expired(datetime.utcnow()))
+    if district_id is not None:
+        stmt = stmt.where(Member.district_id == district_id)
+    stmt = stmt.values(claim_code=None, claim_code_expires_at=None)
+    purged = db.session.execute(stmt.execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return purged
+
+
+def code_sheet_rows(district_id):
+    """
+    Unlinked members of a district holding a valid code, by family and name.
+    """
+    now = datetime.utcnow()
+    return db.session.execute(
+        select(Member.id, Member.name, Member.family, Member.claim_code, Member.claim_code_expires_at)
+        .where(
+            Member.district_id == district_id,
+            Member.user_id.is_(None),
+            Member.claim_code.isnot(None),
+            or_(Member.claim_code_expires_at.is_(None), Member.claim_code_expires_at >= now)
+        )
+        .order_by(Member.family, Member.name, Member.id)
+    ).all()
+
+
+def render_code_sheet(district, rows):
+    return _sheet_template.render(district=district, rows=rows, printed=datetime.utcnow().strftime("%Y-%m-%d"))
@@ -0,0 +1,266 @@
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import column, func, select, table, text
+from app.extensions import db
+from app.models import District, Member, Sacrament, Event, Donation, Announcement
+from app.utils.caching import bump_tables
+from app.utils.rollups import rebuild_rollups
+
+DEFAULT_CHUNK_SIZE = 10000
+# Generated dates count back (and, for events, forward) from this day rather
+# than today, so a seed gives the same rows whenever it is run
+DEFAULT_ANCHOR_DATE = date(2026, 1, 1)
+
+# Every knob the generator reads; override any subset via generate(**options)
+DEFAULTS = {
+    "seed": 42,
+    "districts": 40,
+    "members": 10000,
+    "family_size": (1, 6),          # members per family, uniform
+    "active_ratio": 0.9,
+    "linked_district_ratio": 0.95,  # members with a district
+    "sacraments": {"Baptism": 0.85, "Confirmation": 0.6, "Marriage": 0.3},
+    "anchor_date": DEFAULT_ANCHOR_DATE,  # date or ISO string
+    "years": 3,                     # donation history, ending on anchor_date
+    "donations_per_year": 24,       # mean per member; actual count is exponential around it
+    "donation_types": {"tithe": 0.6, "offering": 0.3, "pledge": 0.1},
+    "amount_median": 1000,
+    "amount_sigma": 0.8,            # lognormal spread
+    "events_per_year": 52,
+    "announcements": 300,
+    "district_announcement_ratio": 0.5,
+    "chunk_size": DEFAULT_CHUNK_SIZE,
+}
+
+FIRST_NAMES = ["Joseph", "Mary", "Peter", "Grace", "John", "Agnes", "Paul", "Esther",
+               "James", "Lucy", "Francis", "Anne", "Michael", "Rose", "Stephen", "Teresa"]
+FAMILY_NAMES = ["Mwangi", "Wanjiku", "Otieno", "Achieng", "Kamau", "Njeri", "Odhiambo",
+                "Wambui", "Kiprop", "Chebet", "Mutua", "Nduta", "Ouma", "Akinyi"]
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert_chunks(model, rows, chunk_size):
+    """
+    executemany Core INSERTs of `rows` (any iterable of dicts) in chunks.
+
+    Goes through an untyped copy of the table so SQLAlchemy skips per-value
+    bind processing. That also skips Python-side column defaults, so rows set
+    created_at themselves and pass dates as ISO strings.
+    """
+    raw = table(model.__tablename__, *[column(c.name) for c in model.__table__.columns])
+    connection = db.session.connection().execution_options(slow_query_log=False)
+    inserted = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            connection.execute(raw.insert(), chunk)
+            inserted += len(chunk)
+            chunk = []
+    if chunk:
+        connection.execute(raw.insert(), chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def _days_back(anchor, count):
+    """
+    ISO strings for `anchor` and the `count - 1` days before it, indexable by offset.
+    """
+    return [(anchor - timedelta(days=offset)).isoformat() for offset in range(count)]
+
+
+def _timestamp():
+    # Same text form SQLAlchemy writes for DateTime on SQLite; Postgres parses it too
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _sync_sequence(model):
+    # Explicit ids leave a Postgres serial behind; SQLite picks max(rowid) itself
+    if db.engine.dialect.name == "postgresql":
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+        ))
+
+
+def _weighted(rng, weights):
+    choices = list(weights)
+    cumulative = list(itertools.accumulate(weights[c] for c in choices))
+    return lambda: choices[bisect.bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+
+def _districts(options, rng, first_id):
+    suffix = rng.getrandbits(24)
+    for i in range(options["districts"]):
+        yield {
+            "id": first_id + i,
+            "name": f"St. {FIRST_NAMES[i % len(FIRST_NAMES)]} Jumuiya {first_id + i}-{suffix:06x}",
+            "leader_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(FAMILY_NAMES)}",
+            "created_at": _timestamp(),
+        }
+
+
+def _members(options, rng, first_id, district_ids):
+    """
+    Members arrive in families sharing a surname, address and district.
+    """
+    now = _timestamp()
+    low, high = options["family_size"]
+    member_id = first_id
+    end = first_id + options["members"]
+    family_number = 0
+
+    while member_id < end:
+        family_number += 1
+        surname = rng.choice(FAMILY_NAMES)
+        family = f"{surname} Family {first_id}-{family_number}"
+        address = f"{rng.randint(1, 999)} {rng.choice(FAMILY_NAMES)} Road"
+        district_id = (
+            rng.choice(district_ids)
+            if district_ids and rng.random() < options["linked_district_ratio"] else None
+        )
+
+        for _ in range(min(rng.randint(low, high), end - member_id)):
+            yield {
+                "id": member_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {surname}",
+                "contact": f"07{rng.randint(0, 99999999):08d}",
+                "address": address,
+                "family": family,
+                "status": "active" if rng.random() < options["active_ratio"] else "inactive",
+                "district_id": district_id,
+                "created_at": now,
+            }
+            member_id += 1
+
+
+def _sacraments(options, rng, member_ids):
+    days = _days_back(options["anchor_date"], 60 * 365)
+    now = _timestamp()
+    for member_id in member_ids:
+        for sacrament_type, probability in options["sacraments"].items():
+            if rng.random() < probability:
+                yield {
+                    "member_id": member_id,
+                    "type": sacrament_type,
+                    "date": days[rng.randrange(len(days))],
+                    "created_at": now,
+                }
+
+
+def _donations(options, rng, member_ids):
+    days = _days_back(options["anchor_date"], max(1, int(options["years"] * 365)))
+    mean = options["donations_per_year"] * options["years"]
+    pick_type = _weighted(rng, options["donation_types"])
+    mu = math.log(options["amount_median"])
+    sigma = options["amount_sigma"]
+    now = _timestamp()
+
+    for member_id in member_ids:
+        count = int(rng.expovariate(1 / mean)) if mean else 0
+        for _ in range(count):
+            yield {
+                "member_id": member_id,
+                # In cents: the untyped insert skips the Money column type
+                "amount": round(rng.lognormvariate(mu, sigma) * 100),
+                "type": pick_type(),
+                "date": days[rng.randrange(len(days))],
+                "created_at": now,
+            }
+
+
+def _events(options, rng):
+    anchor = options["anchor_date"]
+    total = int(options["events_per_year"] * options["years"])
+    span_days = max(1, int(options["years"] * 365))
+    now = _timestamp()
+    for i in range(total):
+        # A quarter of the events fall after the anchor date
+        offset = rng.randrange(span_days) - span_days // 4
+        yield {
+            "name": f"{rng.choice(['Mass', 'Harambee', 'Choir practice', 'Retreat', 'Youth meeting'])} {i + 1}",
+            "description": "Generated event",
+            "date": (anchor - timedelta(days=offset)).isoformat(),
+            "created_at": now,
+        }
+
+
+def _announcements(options, rng, district_ids):
+    anchor = options["anchor_date"]
+    now = _timestamp()
+    for i in range(options["announcements"]):
+        published = anchor - timedelta(days=rng.randint(0, 180))
+        yield {
+            "title": f"Announcement {i + 1}",
+            "message": "Generated parish notice",
+            "category": rng.choice(["general", "mass", "event", "fundraising"]),
+            "publish_date": published.isoformat(),
+            "expiry_date": (published + timedelta(days=rng.randint(7, 90))).isoformat(),
+            "district_id": (
+                rng.choice(district_ids)
+                if district_ids and rng.random() < options["district_announcement_ratio"] else None
+            ),
+            "created_at": now,
+        }
+
+
+def generate(progress=print, **options):
+    """
+    Append a synthetic parish to the database and return row counts per table.
+
+    Rows are produced lazily and written with chunked Core executemany, so
+    memory stays flat however large the run is. The same seed and options
+    always produce the same rows.
+    """
+    unknown = set(options) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown generator options: {', '.join(sorted(unknown))}")
+    options = {**DEFAULTS, **options}
+    if isinstance(options["anchor_date"], str):
+        try:
+            options["anchor_date"] = date.fromisoformat(options["anchor_date"])
+        except ValueError:
+            raise ValueError("anchor_date must be a date, e.g. 2026-01-01")
+    if not isinstance(options["anchor_date"], date):
+        raise ValueError("anchor_date must be a date, e.g. 2026-01-01")
+    rng = random.Random(options["seed"])
+    chunk_size = options["chunk_size"]
+    counts = {}
+
+    def step(name, model, rows):
+        started = time.perf_counter()
+        counts[name] = _insert_chunks(model, rows, chunk_size)
+        _sync_sequence(model)
+        progress(f"  {name}: {counts[name]} rows in {time.perf_counter() - started:.1f}s")
+
+    first_district = _next_id(District)
+    step("districts", District, _districts(options, rng, first_district))
+    district_ids = list(range(first_district, first_district + options["districts"]))
+    if not district_ids:
+        district_ids = list(db.session.scalars(select(District.id)))
+
+    first_member = _next_id(Member)
+    step("members", Member, _members(options, rng, first_member, district_ids))
+    member_ids = range(first_member, first_member + options["members"])
+
+    step("sacraments", Sacrament, _sacraments(options, rng, member_ids))
+    step("donations", Donation, _donations(options, rng, member_ids))
+    step("events", Event, _events(options, rng))
+    step("announcements", Announcement, _announcements(options, rng, district_ids))
+
+    bump_tables(db.session.connection(), ["district", "member", "event", "announcement"])
+    db.session.commit()
+
+    started = time.perf_counter()
+    counts["donation_rollups"] = rebuild_rollups()
+    progress(f"  donation_rollups: {counts['donation_rollups']} rows in {time.perf_counter() - started:.1f}s")
+    return counts
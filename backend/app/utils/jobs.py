@@ -0,0 +1,373 @@
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models import Job
+
+logger = logging.getLogger("app.jobs")
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_POLL_SECONDS = 2.0
+# A running job whose heartbeat is older than this is assumed dead
+DEFAULT_STALE_SECONDS = 300
+DEFAULT_RETENTION_DAYS = 7
+HEARTBEAT_SECONDS = 30
+# How often a job re-reads cancel_requested while reporting progress
+CANCEL_CHECK_SECONDS = 1.0
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# kind -> (function, max running at once across all processes)
+_registry = {}
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when an admin has asked for it to stop."""
+
+
+def register_job(kind, fn, limit=1):
+    """
+    Register `fn(ctx, **params)` as a background job type, with at most
+    `limit` running at once. Its return value (JSON-serializable) is stored
+    as the job's result.
+    """
+    _registry[kind] = (fn, limit)
+
+
+def job_kinds():
+    return sorted(_registry)
+
+
+def jobs_root():
+    return (
+        current_app.config.get("JOBS_DIR")
+        or os.getenv("JOBS_DIR")
+        or os.path.join(current_app.instance_path, "jobs")
+    )
+
+
+def _setting(name, default, cast=int):
+    value = current_app.config.get(name)
+    if value is None:
+        value = os.getenv(name)
+    return cast(value) if value not in (None, "") else default
+
+
+def _worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """
+    Handed to a running job: progress reporting, cancellation checks and a
+    private folder for file results.
+    """
+
+    def __init__(self, job_id, root):
+        self.job_id = job_id
+        self.root = root
+        self._last_check = 0.0
+
+    def output_path(self, filename):
+        directory = os.path.join(self.root, str(self.job_id))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+    def progress(self, done, total=None):
+        """
+        Record progress and stop the job if it has been cancelled. Writes go
+        through their own connection so they're visible while the job's
+        transaction is still open, and the cancel flag is read the same way
+        so a long-running read can't hide it.
+        """
+        now = time.monotonic()
+        if now - self._last_check < CANCEL_CHECK_SECONDS:
+            return
+        self._last_check = now
+
+        cancelled = False
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    update(Job)
+                    .where(Job.id == self.job_id)
+                    .values(progress={"done": done, "total": total}, heartbeat_at=datetime.utcnow())
+                )
+                cancelled = connection.execute(
+                    select(Job.cancel_requested).where(Job.id == self.job_id)
+                ).scalar()
+        except OperationalError:
+            # Progress is advisory; a locked database shouldn't fail the job
+            logger.debug("Skipped progress update for job %s", self.job_id)
+        if cancelled:
+            raise JobCancelled("Job was cancelled")
+
+
+# ---------------- QUEUE ----------------
+
+def enqueue(kind, params=None, created_by=None):
+    """
+    Queue a job and make sure this process has a runner to pick it up.
+    """
+    if not isinstance(kind, str) or kind not in _registry:
+        raise ValueError(f"Unknown job type: {kind}. Use any of: {', '.join(job_kinds())}")
+
+    record = Job(kind=kind, params=params or {}, created_by=created_by, status="queued")
+    db.session.add(record)
+    db.session.commit()
+
+    runner = start_job_runner(current_app._get_current_object())
+    if runner:
+        runner.wake()
+    return record
+
+
+def cancel(record):
+    """
+    Cancel a queued job outright; ask a running one to stop at its next
+    progress report. Returns False if the job has already finished.
+    """
+    if record.status in FINISHED_STATUSES:
+        return False
+
+    # Conditional update, so a job claimed in the meantime is asked to stop instead
+    claimed = db.session.execute(
+        update(Job)
+        .where(Job.id == record.id, Job.status == "queued")
+        .values(status="cancelled", finished_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        db.session.execute(update(Job).where(Job.id == record.id).values(cancel_requested=True))
+    db.session.commit()
+    db.session.refresh(record)
+    return True
+
+
+def _lock_kind(kind):
+    """
+    Serialize claims of one job type until the transaction ends. On Postgres
+    (READ COMMITTED) two workers would otherwise each count 0 running under
+    their own snapshot and both claim; SQLite already runs writers one at a
+    time, so the conditional UPDATE below is enough there.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        # crc32, not hash(): the key must be the same in every process
+        db.session.execute(select(func.pg_advisory_xact_lock(zlib.crc32(f"job:{kind}".encode()))))
+
+
+def _claim_next(worker):
+    """
+    Atomically move the oldest queued job whose type is under its
+    concurrency limit to running. Returns the claimed job id or None.
+    """
+    candidates = db.session.execute(
+        select(Job.id, Job.kind)
+        .where(Job.status == "queued")
+        .order_by(Job.id)
+        .limit(20)
+    ).all()
+
+    running = aliased(Job)
+    for job_id, kind in candidates:
+        if kind not in _registry:
+            continue
+        limit = _registry[kind][1]
+        _lock_kind(kind)
+        now = datetime.utcnow()
+        # The limit is checked in the same statement that claims the job
+        running_count = (
+            select(func.count(running.id))
+            .where(running.kind == kind, running.status == "running")
+            .scalar_subquery()
+        )
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued", running_count < limit)
+            .values(status="running", worker=worker, started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def _finish(job_id, status, result=None, error=None):
+    db.session.rollback()
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def run_job(job_id, root):
+    record = db.session.get(Job, job_id)
+    fn = _registry[record.kind][0]
+    params = dict(record.params or {})
+    db.session.commit()
+
+    started = time.perf_counter()
+    try:
+        result = fn(JobContext(job_id, root), **params)
+    except JobCancelled:
+        _finish(job_id, "cancelled", error="Cancelled")
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, record.kind)
+        _finish(job_id, "failed", error=f"{e.__class__.__name__}: {e}")
+    else:
+        try:
+            _finish(job_id, "succeeded", result=result)
+        except Exception as e:
+            logger.exception("Job %s (%s) result could not be stored", job_id, record.kind)
+            _finish(job_id, "failed", error=f"Result could not be stored: {e.__class__.__name__}")
+    finally:
+        db.session.remove()
+    logger.info("Job %s finished in %.1fs", job_id, time.perf_counter() - started)
+
+
+def reap_stale_jobs(stale_seconds):
+    """
+    Fail running jobs whose worker stopped heartbeating (crash, deploy).
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    reaped = db.session.execute(
+        update(Job)
+        .where(Job.status == "running", Job.heartbeat_at < cutoff)
+        .values(status="failed", error="Worker stopped responding", finished_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return reaped
+
+
+def purge_finished_jobs(retention_days, root):
+    """
+    Delete finished jobs older than the retention window, with their files.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    expired = db.session.execute(
+        select(Job.id).where(Job.status.in_(FINISHED_STATUSES), Job.finished_at < cutoff)
+    ).scalars().all()
+    if not expired:
+        return 0
+
+    db.session.execute(Job.__table__.delete().where(Job.id.in_(expired)))
+    db.session.commit()
+    for job_id in expired:
+        shutil.rmtree(os.path.join(root, str(job_id)), ignore_errors=True)
+    return len(expired)
+
+
+# ---------------- RUNNER ----------------
+
+class JobRunner:
+    """
+    A small pool of threads in this process that claim and run queued jobs,
+    plus a housekeeping thread for heartbeats, stale jobs and retention.
+    """
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.workers = workers
+        self.name = _worker_name()
+        self.pid = os.getpid()
+        with app.app_context():
+            self.root = jobs_root()
+            self.poll_seconds = _setting("JOB_POLL_SECONDS", DEFAULT_POLL_SECONDS, float)
+            self.stale_seconds = _setting("JOB_STALE_SECONDS", DEFAULT_STALE_SECONDS)
+            self.retention_days = _setting("JOB_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._active = set()
+        self._active_lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._housekeeping, name="job-housekeeping", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    job_id = _claim_next(self.name)
+                    if job_id is not None:
+                        with self._active_lock:
+                            self._active.add(job_id)
+                        try:
+                            run_job(job_id, self.root)
+                        finally:
+                            with self._active_lock:
+                                self._active.discard(job_id)
+                        continue
+            except Exception:
+                logger.exception("Job worker loop failed")
+
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+    def _housekeeping(self):
+        last_purge = 0.0
+        while not self._stopping.wait(HEARTBEAT_SECONDS):
+            try:
+                with self.app.app_context():
+                    with self._active_lock:
+                        active = list(self._active)
+                    if active:
+                        db.session.execute(
+                            update(Job).where(Job.id.in_(active)).values(heartbeat_at=datetime.utcnow())
+                        )
+                        db.session.commit()
+                    reap_stale_jobs(self.stale_seconds)
+                    if time.monotonic() - last_purge > 3600:
+                        purge_finished_jobs(self.retention_days, self.root)
+                        last_purge = time.monotonic()
+                    db.session.remove()
+            except Exception:
+                logger.exception("Job housekeeping failed")
+
+
+def start_job_runner(app, workers=None):
+    """
+    Start this process's job runner once; JOB_WORKERS=0 disables it (e.g.
+    when a separate `flask run-jobs` process does the work).
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is not None and _runner.pid == os.getpid():
+            return _runner
+        if workers is None:
+            with app.app_context():
+                workers = _setting("JOB_WORKERS", DEFAULT_JOB_WORKERS)
+        if workers <= 0:
+            return None
+        _runner = JobRunner(app, workers)
+        _runner.start()
+    return _runner
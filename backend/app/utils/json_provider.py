@@ -0,0 +1,40 @@
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used without it
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that writes dates as ISO 8601 and Decimals as numbers,
+    and uses orjson when it's installed, falling back to the stdlib encoder
+    otherwise.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):  # datetime too
+            return o.isoformat()
+        if isinstance(o, Decimal):
+            # Money amounts: exact as a JSON number up to 15 significant digits
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        # orjson is always compact; anything else (indent in debug mode) goes to the stdlib
+        if orjson is None or set(kwargs) - {"separators"}:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
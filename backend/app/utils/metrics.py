@@ -0,0 +1,125 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from flask import g, has_request_context, request
+from app.utils.query_timing import on_query
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Per-process request and SQL statistics, keyed by Flask endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.requests = defaultdict(int)
+        self.db_time = defaultdict(float)
+
+    def observe_request(self, endpoint, method, status, duration, query_count, db_time):
+        with self._lock:
+            self.latency[(endpoint, method)].observe(duration)
+            self.requests[(endpoint, method, status)] += 1
+            self.queries[endpoint].observe(query_count)
+            self.db_time[endpoint] += db_time
+
+    def render(self):
+        """
+        Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = []
+
+            lines.append("# HELP http_request_duration_seconds Request latency by endpoint.")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (endpoint, method), hist in sorted(self.latency.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                lines.extend(_histogram_lines("http_request_duration_seconds", labels, hist))
+
+            lines.append("# HELP http_requests_total Requests by endpoint and status.")
+            lines.append("# TYPE http_requests_total counter")
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}'
+                )
+
+            lines.append("# HELP db_queries_per_request SQL statements executed per request.")
+            lines.append("# TYPE db_queries_per_request histogram")
+            for endpoint, hist in sorted(self.queries.items()):
+                lines.extend(_histogram_lines("db_queries_per_request", f'endpoint="{endpoint}"', hist))
+
+            lines.append("# HELP db_query_seconds_total Time spent in SQL by endpoint.")
+            lines.append("# TYPE db_query_seconds_total counter")
+            for endpoint, value in sorted(self.db_time.items()):
+                lines.append(f'db_query_seconds_total{{endpoint="{endpoint}"}} {value:.6f}')
+
+            return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name, labels, hist):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+# ---------- SQL accounting ----------
+
+def _record_query(conn, statement, parameters, context, executemany, elapsed):
+    if has_request_context() and "metrics_started" in g:
+        g.metrics_queries += 1
+        g.metrics_db_time += elapsed
+
+
+def register_sql_hooks():
+    on_query(_record_query)
+
+
+# ---------- Request timing ----------
+
+def start_request_timer():
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_db_time = 0.0
+
+
+def record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+
+    registry.observe_request(
+        request.endpoint or "unmatched",
+        request.method,
+        response.status_code,
+        time.perf_counter() - started,
+        g.metrics_queries,
+        g.metrics_db_time
+    )
+    return response
@@ -0,0 +1,71 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import BigInteger, Float, cast, func, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+# Largest amount accepted for a single gift
+MAX_AMOUNT = Decimal("10000000")
+
+
+class Money(TypeDecorator):
+    """
+    Currency amount stored as integer cents and handed to Python as a
+    Decimal with two places. Integers sum exactly in SQL on every backend,
+    where SQLite would store Numeric as a float. SUM/MIN/MAX over a Money
+    column come back as Money too; AVG needs `type_=Money()`.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int((to_decimal(value) / CENT).to_integral_value(ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # AVG comes back as a float (SQLite) or numeric (Postgres) of cents
+        return (to_decimal(value) * CENT).quantize(CENT, ROUND_HALF_UP)
+
+
+def to_decimal(value):
+    # Via str so a JSON float like 10.1 means 10.1, not its binary neighbour
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def money_avg(total, count):
+    """
+    SQL average of a summed Money expression over a summed count, e.g. from
+    the rollups, rounded to the cent when read.
+    """
+    return type_coerce(cast(total, Float) / func.nullif(count, 0), Money())
+
+
+def parse_amount(value):
+    """
+    A positive amount with at most two decimal places, as a Decimal.
+    Raises ValueError otherwise.
+    """
+    if isinstance(value, bool):
+        raise ValueError("amount must be a number")
+    try:
+        amount = to_decimal(value)
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError("amount must be a number")
+    if not amount.is_finite():
+        raise ValueError("amount must be a number")
+    if amount <= 0:
+        raise ValueError("amount must be positive")
+    if amount > MAX_AMOUNT:
+        raise ValueError(f"amount must be at most {MAX_AMOUNT}")
+    if amount != amount.quantize(CENT):
+        raise ValueError("amount must have at most 2 decimal places")
+    return amount.quantize(CENT)
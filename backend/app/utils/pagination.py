@@ -0,0 +1,176 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+
+def get_limit():
+    """
+    Read ?limit= from the request, clamped to PAGINATION_MAX_LIMIT.
+    """
+    default = current_app.config.get("PAGINATION_DEFAULT_LIMIT", DEFAULT_LIMIT)
+    maximum = current_app.config.get("PAGINATION_MAX_LIMIT", MAX_LIMIT)
+
+    raw = request.args.get("limit")
+    if raw is None:
+        return min(default, maximum)
+
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    return min(limit, maximum)
+
+
+def parse_date_arg(name):
+    """
+    Parse an optional YYYY-MM-DD query argument.
+    """
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"Invalid {name}. Use YYYY-MM-DD")
+
+
+def filter_date_range(query, column):
+    """
+    Apply ?date_from= / ?date_to= (both inclusive) to a query.
+    """
+    date_from = parse_date_arg("date_from")
+    date_to = parse_date_arg("date_to")
+
+    if date_from:
+        query = query.filter(column >= date_from)
+    if date_to:
+        query = query.filter(column <= date_to)
+    return query
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(value, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort, value, row_id):
+    payload = json.dumps({"s": sort, "v": _encode_value(value), "id": row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload["s"], payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _after(column, id_column, value, row_id, descending):
+    """
+    Rows strictly after (value, row_id) in ORDER BY column, id with NULLS LAST.
+    """
+    if value is None:
+        id_cmp = id_column < row_id if descending else id_column > row_id
+        return and_(column.is_(None), id_cmp)
+
+    if descending:
+        past = or_(column < value, and_(column == value, id_column < row_id))
+    else:
+        past = or_(column > value, and_(column == value, id_column > row_id))
+    return or_(past, column.is_(None))
+
+
+def keyset_page(query, id_column, sort_columns, default_sort):
+    """
+    Fetch one page of `query` using keyset pagination.
+
+    `sort_columns` maps the names accepted in ?sort= to columns; a leading
+    "-" sorts descending. The id column breaks ties so ordering is stable.
+    """
+    sort = request.args.get("sort", default_sort)
+    name = sort.lstrip("-")
+    descending = sort.startswith("-")
+
+    if name not in sort_columns:
+        allowed = ", ".join(sorted(sort_columns))
+        raise ValueError(f"Invalid sort. Use one of: {allowed}")
+
+    column = sort_columns[name]
+    limit = get_limit()
+
+    token = request.args.get("cursor")
+    if token:
+        cursor_sort, raw_value, row_id = decode_cursor(token)
+        if cursor_sort != sort:
+            raise ValueError("Cursor does not match sort order")
+        try:
+            value = _decode_value(raw_value, column)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        query = query.filter(_after(column, id_column, value, row_id, descending))
+
+    if descending:
+        order = [column.desc().nulls_last(), id_column.desc()]
+    else:
+        order = [column.asc().nulls_last(), id_column.asc()]
+
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort,
+            getattr(last, column.key),
+            getattr(last, id_column.key)
+        )
+
+    return Page(rows, next_cursor)
+
+
+def page_response(results, next_cursor):
+    """
+    JSON list response with the next page advertised in Link / X-Next-Cursor.
+    """
+    response = jsonify(results)
+
+    if next_cursor:
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        next_url = f"{request.base_url}?{urlencode(args)}"
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return response
@@ -0,0 +1,103 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# werkzeug method strings, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+DEFAULT_HASH_METHOD = "scrypt:32768:8:1"
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_HASH_TIMEOUT = 10
+# Hashes queued or running per worker before new ones are turned away
+DEFAULT_HASH_QUEUE_PER_WORKER = 4
+
+# What werkzeug fills in for parameters a method string leaves out
+_METHOD_DEFAULTS = {
+    "scrypt": ("32768", "8", "1"),
+    "pbkdf2": ("sha256", str(DEFAULT_PBKDF2_ITERATIONS)),
+}
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool's queue is full or the work times out."""
+
+
+def hash_method():
+    return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+
+
+def _get_executor():
+    """
+    Bounded pool so CPU-heavy hashing can't take over every request thread,
+    with a bounded number of hashes queued or running on it.
+    """
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = current_app.config.get("PASSWORD_HASH_WORKERS", DEFAULT_HASH_WORKERS)
+                _slots = threading.BoundedSemaphore(workers * current_app.config.get(
+                    "PASSWORD_HASH_QUEUE_PER_WORKER", DEFAULT_HASH_QUEUE_PER_WORKER
+                ))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+    return _executor, _slots
+
+
+def _run(fn, *args):
+    # hashlib's scrypt / pbkdf2 release the GIL, so other requests keep running
+    timeout = current_app.config.get("PASSWORD_HASH_TIMEOUT", DEFAULT_HASH_TIMEOUT)
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        raise HashingBusyError("Password hashing is busy, try again shortly")
+    future = executor.submit(fn, *args)
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        # cancel() only drops a hash still queued; one already running can't
+        # be stopped and keeps its slot until it finishes, which is what
+        # bounds the work left behind by timed-out requests
+        future.cancel()
+        raise HashingBusyError("Password hashing is busy, try again shortly")
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, hash_method())
+
+
+def verify_password(password_hash, password):
+    if not password_hash or password is None:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+def _method_params(method):
+    """
+    (algorithm, *cost parameters) with werkzeug's defaults filled in, so
+    "pbkdf2" and "pbkdf2:sha256:1000000" compare equal.
+    """
+    name, *params = method.split(":")
+    defaults = _METHOD_DEFAULTS.get(name, ())
+    return (name, *params, *defaults[len(params):])
+
+
+def needs_rehash(password_hash):
+    """
+    True when a stored hash was made with a different method or cost.
+    """
+    return _method_params(password_hash.split("$", 1)[0]) != _method_params(hash_method())
+
+
+def configure_from_env(app):
+    if os.getenv("PASSWORD_HASH_METHOD"):
+        app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD")
+    if os.getenv("PASSWORD_HASH_WORKERS"):
+        app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS"))
+    if os.getenv("PASSWORD_HASH_TIMEOUT"):
+        app.config["PASSWORD_HASH_TIMEOUT"] = float(os.getenv("PASSWORD_HASH_TIMEOUT"))
+    if os.getenv("PASSWORD_HASH_QUEUE_PER_WORKER"):
+        app.config["PASSWORD_HASH_QUEUE_PER_WORKER"] = int(os.getenv("PASSWORD_HASH_QUEUE_PER_WORKER"))
@@ -0,0 +1,148 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that also records how long callers wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            # Connect errors propagate as they are; only a full pool counts
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep the instrumentation across engine.dispose()
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.wait_total = self.wait_total
+        pool.wait_max = self.wait_max
+        return pool
+
+
+def postgres_engine_options():
+    """
+    Engine options for PostgreSQL, tunable through the environment.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s),
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS (0 disables), DB_SSLMODE.
+    """
+    connect_args = {"sslmode": os.getenv("DB_SSLMODE", "require")}
+
+    # Enforced by the server on every statement of every connection, except
+    # where exempt_statement_timeout() lifts it (CLI commands, migrations)
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+    if statement_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        # Managed Postgres drops idle connections; recycle and ping before use
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "connect_args": connect_args,
+    }
+
+
+def _no_statement_timeout(dialect, connection_record, cargs, cparams):
+    options = re.sub(r"-c\s*statement_timeout=\S+", "", cparams.get("options", ""))
+    cparams["options"] = f"{options.strip()} -c statement_timeout=0".strip()
+
+
+def exempt_statement_timeout(engine):
+    """
+    Lift the server statement_timeout for connections this engine opens
+    from now on. For one-off maintenance work (migrations, rollup rebuilds,
+    data generation) whose single statements may run for minutes; request
+    handling keeps the limit.
+    """
+    if engine.dialect.name != "postgresql" or event.contains(engine, "do_connect", _no_statement_timeout):
+        return
+    event.listen(engine, "do_connect", _no_statement_timeout)
+    # Connections already pooled were opened with the limit
+    engine.dispose()
+
+
+def _sqlite_on_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        # WAL lets background jobs write progress while a long read is open
+        # (and requests read while a job writes); :memory: databases ignore it
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+def register_sqlite_pragmas():
+    if not event.contains(Engine, "connect", _sqlite_on_connect):
+        event.listen(Engine, "connect", _sqlite_on_connect)
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            checkouts = pool.checkouts
+            stats.update({
+                "checkouts": checkouts,
+                "checkout_timeouts": pool.timeouts,
+                "wait_total_ms": round(pool.wait_total * 1000, 2),
+                "wait_avg_ms": round(pool.wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                "wait_max_ms": round(pool.wait_max * 1000, 2),
+            })
+
+    return stats
@@ -0,0 +1,44 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Callbacks run after every statement as fn(conn, statement, parameters,
+# context, executemany, elapsed_seconds)
+_listeners = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start", None)
+    if started is None:
+        return
+    del context._query_start
+    elapsed = time.perf_counter() - started
+
+    for listener in _listeners:
+        listener(conn, statement, parameters, context, executemany, elapsed)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    context = exception_context.execution_context
+    if context is not None and hasattr(context, "_query_start"):
+        del context._query_start
+
+
+def on_query(listener):
+    """
+    Call `listener` with the elapsed time of every SQL statement, on every
+    engine. The start time lives on the statement's execution context, so
+    nothing is left behind when a statement raises.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+    if listener not in _listeners:
+        _listeners.append(listener)
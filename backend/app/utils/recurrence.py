@@ -0,0 +1,256 @@
+import calendar
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+# COUNT rules are expanded in full once, when saved, to find their last date
+MAX_COUNT = 1000
+# A rule that can't match (e.g. 30 February) gives up after this many empty periods
+MAX_EMPTY_PERIODS = 1000
+
+Rule = namedtuple("Rule", ["freq", "interval", "byday", "bymonthday", "bymonth", "count", "until"])
+
+_BYDAY = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+def _int_list(name, raw, high, negative=False):
+    values = []
+    for part in raw.split(","):
+        try:
+            value = int(part)
+        except ValueError:
+            raise ValueError(f"{name} must be a list of integers")
+        if not 1 <= (abs(value) if negative else value) <= high:
+            raise ValueError(f"{name} values must be between 1 and {high}" + (" (or negative)" if negative else ""))
+        values.append(value)
+    return tuple(values)
+
+
+def parse_rrule(text):
+    """
+    Parse the RFC 5545 RRULE subset the calendar supports: FREQ (DAILY,
+    WEEKLY, MONTHLY, YEARLY), INTERVAL, BYDAY (e.g. SU, or 1SU / -1FR for
+    monthly rules), BYMONTHDAY, BYMONTH, COUNT and UNTIL (a date).
+    Raises ValueError on anything else.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("rrule is required, e.g. FREQ=WEEKLY;BYDAY=SU")
+
+    parts = {}
+    for item in text.strip().upper().removeprefix("RRULE:").split(";"):
+        if not item:
+            continue
+        key, sep, value = item.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Invalid rrule part: {item}")
+        if key in parts:
+            raise ValueError(f"Duplicate rrule part: {key}")
+        parts[key] = value
+
+    unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "BYMONTH", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"Unsupported rrule parts: {', '.join(sorted(unknown))}")
+
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+    except ValueError:
+        raise ValueError("INTERVAL must be an integer")
+    if not 1 <= interval <= 1000:
+        raise ValueError("INTERVAL must be between 1 and 1000")
+
+    byday = ()
+    if "BYDAY" in parts:
+        days = []
+        for part in parts["BYDAY"].split(","):
+            match = _BYDAY.match(part)
+            if not match:
+                raise ValueError(f"Invalid BYDAY value: {part}")
+            ordinal = int(match.group(1)) if match.group(1) else None
+            if ordinal is not None and (freq != "MONTHLY" or not 1 <= abs(ordinal) <= 5):
+                raise ValueError("BYDAY ordinals (e.g. 1SU, -1FR) are only supported for MONTHLY, from -5 to 5")
+            days.append((ordinal, WEEKDAYS.index(match.group(2))))
+        byday = tuple(days)
+
+    bymonthday = _int_list("BYMONTHDAY", parts["BYMONTHDAY"], 31, negative=True) if "BYMONTHDAY" in parts else ()
+    bymonth = _int_list("BYMONTH", parts["BYMONTH"], 12) if "BYMONTH" in parts else ()
+    if bymonthday and freq in ("DAILY", "WEEKLY"):
+        raise ValueError("BYMONTHDAY is only supported for MONTHLY and YEARLY")
+    if freq == "YEARLY" and byday and not bymonth:
+        raise ValueError("YEARLY with BYDAY needs BYMONTH")
+
+    count = None
+    if "COUNT" in parts:
+        try:
+            count = int(parts["COUNT"])
+        except ValueError:
+            raise ValueError("COUNT must be an integer")
+        if not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"COUNT must be between 1 and {MAX_COUNT}")
+
+    until = None
+    if "UNTIL" in parts:
+        raw = parts["UNTIL"][:8]
+        try:
+            until = date(int(raw[:4]), int(raw[4:6]), int(raw[6:8]))
+        except ValueError:
+            raise ValueError("UNTIL must be a date, e.g. 20261231")
+    if count and until:
+        raise ValueError("Use COUNT or UNTIL, not both")
+
+    return Rule(freq, interval, byday, bymonthday, bymonth, count, until)
+
+
+def format_rrule(rule):
+    """
+    Canonical RRULE text for a parsed rule, as stored on the series.
+    """
+    parts = [f"FREQ={rule.freq}"]
+    if rule.interval != 1:
+        parts.append(f"INTERVAL={rule.interval}")
+    if rule.byday:
+        days = [f"{ordinal or ''}{WEEKDAYS[weekday]}" for ordinal, weekday in rule.byday]
+        parts.append(f"BYDAY={','.join(days)}")
+    if rule.bymonthday:
+        parts.append(f"BYMONTHDAY={','.join(map(str, rule.bymonthday))}")
+    if rule.bymonth:
+        parts.append(f"BYMONTH={','.join(map(str, rule.bymonth))}")
+    if rule.count:
+        parts.append(f"COUNT={rule.count}")
+    if rule.until:
+        parts.append(f"UNTIL={rule.until.strftime('%Y%m%d')}")
+    return ";".join(parts)
+
+
+# ---------------- EXPANSION ----------------
+
+def _add_months(year, month, months):
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def _month_days(rule, year, month, start):
+    """
+    Candidate days of one month: BYMONTHDAY and/or BYDAY (both given means
+    days matching both, per RFC 5545, e.g. Friday the 13th), else the
+    start's day.
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    if not rule.bymonthday and not rule.byday:
+        days = {start.day}
+    else:
+        days = set(range(1, days_in_month + 1))
+        if rule.bymonthday:
+            days &= {d if d > 0 else days_in_month + d + 1 for d in rule.bymonthday}
+        if rule.byday:
+            weekdays = set()
+            for ordinal, weekday in rule.byday:
+                first = (weekday - date(year, month, 1).weekday()) % 7 + 1
+                matches = list(range(first, days_in_month + 1, 7))
+                if ordinal is None:
+                    weekdays.update(matches)
+                elif -len(matches) <= ordinal <= len(matches):
+                    weekdays.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+            days &= weekdays
+    return [date(year, month, d) for d in sorted(days) if 1 <= d <= days_in_month]
+
+
+def _period(rule, start, index):
+    """
+    (first day of the index-th period, its candidate dates in order).
+    """
+    if rule.freq == "DAILY":
+        day = start + timedelta(days=index * rule.interval)
+        return day, [day]
+
+    if rule.freq == "WEEKLY":
+        week = start - timedelta(days=start.weekday()) + timedelta(weeks=index * rule.interval)
+        weekdays = sorted({weekday for _, weekday in rule.byday}) or [start.weekday()]
+        return week, [week + timedelta(days=weekday) for weekday in weekdays]
+
+    if rule.freq == "MONTHLY":
+        year, month = _add_months(start.year, start.month, index * rule.interval)
+        return date(year, month, 1), _month_days(rule, year, month, start)
+
+    year = start.year + index * rule.interval
+    days = []
+    for month in rule.bymonth or (start.month,):
+        days.extend(_month_days(rule, year, month, start))
+    return date(year, 1, 1), sorted(days)
+
+
+def _first_period(rule, start, on_or_after):
+    """
+    Index of the period holding `on_or_after`, so a window far from the
+    series start is reached without walking every earlier period.
+    """
+    if on_or_after <= start:
+        return 0
+    if rule.freq == "DAILY":
+        elapsed = (on_or_after - start).days
+    elif rule.freq == "WEEKLY":
+        monday = on_or_after - timedelta(days=on_or_after.weekday())
+        elapsed = (monday - (start - timedelta(days=start.weekday()))).days // 7
+    elif rule.freq == "MONTHLY":
+        elapsed = (on_or_after.year - start.year) * 12 + on_or_after.month - start.month
+    else:
+        elapsed = on_or_after.year - start.year
+    return elapsed // rule.interval
+
+
+def occurrences(rule, start, date_from=None, date_to=None, exdates=()):
+    """
+    Lazily yield the rule's dates from `start` within [date_from, date_to],
+    in order. Without a window end the rule's own COUNT / UNTIL bounds it.
+    """
+    # COUNT counts from the start, so those rules can't skip ahead
+    index = 0 if rule.count else _first_period(rule, start, date_from or start)
+    produced = 0
+    empty = 0
+    exdates = set(exdates)
+
+    while empty < MAX_EMPTY_PERIODS:
+        try:
+            period_start, days = _period(rule, start, index)
+        except (OverflowError, ValueError):
+            return  # past year 9999
+        index += 1
+        if (date_to and period_start > date_to) or (rule.until and period_start > rule.until):
+            return
+
+        if rule.bymonth and rule.freq != "YEARLY":
+            days = [d for d in days if d.month in rule.bymonth]
+        if rule.byday and rule.freq == "DAILY":
+            days = [d for d in days if d.weekday() in {weekday for _, weekday in rule.byday}]
+        days = [d for d in days if d >= start]
+        empty = 0 if days else empty + 1
+
+        for day in days:
+            if (rule.until and day > rule.until) or (date_to and day > date_to):
+                return
+            produced += 1
+            if rule.count and produced > rule.count:
+                return
+            if (date_from and day < date_from) or day in exdates:
+                continue
+            yield day
+
+
+def last_occurrence(rule, start):
+    """
+    The series' final date, or None when it repeats forever. Stored on the
+    series so a calendar window finds it with an indexed range query.
+    """
+    if rule.until:
+        return rule.until
+    if rule.count:
+        last = None
+        for last in occurrences(rule, start):
+            pass
+        return last
+    return None
@@ -1,7 +1,145 @@
+import threading
+import time
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify
 from flask_jwt_extended import get_jwt, verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
 from app.models import User
+from app.utils.caching import bump_versions, get_version
+
+# user_id -> (current role, "roles" version, expiry timestamp)
+_role_cache = {}
+_role_cache_lock = threading.Lock()
+# ("roles" version, when to read it again), shared by every request of this process
+_roles_version = (None, 0.0)
+
+DEFAULT_ROLE_CACHE_TTL = 300
+# How long another process's role change can go unnoticed here
+DEFAULT_ROLE_VERSION_INTERVAL = 5
+
+
+def _current_roles_version(now):
+    """
+    The shared "roles" version, read from the database at most once per
+    ROLE_VERSION_INTERVAL seconds per process.
+    """
+    global _roles_version
+    with _role_cache_lock:
+        version, recheck_at = _roles_version
+    if recheck_at > now:
+        return version
+
+    version, _ = get_version("roles")
+    interval = current_app.config.get("ROLE_VERSION_INTERVAL", DEFAULT_ROLE_VERSION_INTERVAL)
+    with _role_cache_lock:
+        _roles_version = (version, now + interval)
+    return version
+
+
+def get_current_role(user_id):
+    """
+    Current role for a user, served from the in-process cache while fresh,
+    so most requests check their role without touching the database.
+
+    Entries are tied to the shared "roles" version, which is bumped when a
+    role changes or a user is deleted (see _track_role_changes), so such a
+    change by any worker or CLI command is seen everywhere within
+    ROLE_VERSION_INTERVAL. The TTL only bounds writes that bypass
+    SQLAlchemy. Unknown users aren't cached, so a later sign-up isn't
+    shadowed.
+    """
+    now = time.monotonic()
+    version = _current_roles_version(now)
+    with _role_cache_lock:
+        cached = _role_cache.get(user_id)
+    if cached and cached[1] == version and cached[2] > now:
+        return cached[0]
+
+    role = db.session.query(User.role).filter_by(id=user_id).scalar()
+    if role is not None:
+        ttl = current_app.config.get("ROLE_CACHE_TTL", DEFAULT_ROLE_CACHE_TTL)
+        with _role_cache_lock:
+            _role_cache[user_id] = (role, version, now + ttl)
+    return role
+
+
+# ---------------- ROLE CHANGE TRACKING ----------------
+
+def _roles_changed(session, connection):
+    bump_versions(connection, ["roles"])
+    session.info["roles_changed"] = True
+
+
+def _track_role_changes(session, flush_context, instances):
+    # Sign-ups and password rehashes don't touch "roles"; only roles and deletions do
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            return _roles_changed(session, session.connection())
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes():
+            return _roles_changed(session, session.connection())
+
+
+def _track_bulk_role_changes(state):
+    mapper = state.bind_mapper
+    if mapper is not None and mapper.class_ is User and (state.is_update or state.is_delete):
+        _roles_changed(state.session, state.session.connection())
+
+
+def _after_commit(session):
+    # Let this process see its own change on the next request
+    global _roles_version
+    if session.info.pop("roles_changed", False):
+        with _role_cache_lock:
+            _roles_version = (None, 0.0)
+
+
+def _after_rollback(session):
+    session.info.pop("roles_changed", None)
+
+
+def register_role_tracking():
+    if not event.contains(Session, "before_flush", _track_role_changes):
+        event.listen(Session, "before_flush", _track_role_changes)
+        event.listen(Session, "do_orm_execute", _track_bulk_role_changes)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+
+class AuthorizationError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _authorized_role():
+    """
+    Verify the JWT and return the caller's role.
+
+    The role comes from the signed `role` claim; the cache only confirms the
+    claim still matches the user's current role, so a token issued before a
+    role change or deletion is rejected once the change has been seen.
+    """
+    verify_jwt_in_request()
+
+    try:
+        user_id = int(get_jwt_identity())
+    except (ValueError, TypeError):
+        raise AuthorizationError("Invalid user ID", 400)
+
+    current_role = get_current_role(user_id)
+    if current_role is None:
+        raise AuthorizationError("User not found", 404)
+
+    claimed_role = get_jwt().get("role")
+    if claimed_role is not None and claimed_role != current_role:
+        raise AuthorizationError("Token is out of date, please log in again", 401)
+
+    return current_role
+
 
 def admin_required():
     """
@@ -11,36 +149,19 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                # Verify JWT is present
-                verify_jwt_in_request()
-                
-                # Get user identity from JWT (as string)
-                user_id_str = get_jwt_identity()
-                
-                # Convert to integer for database query
-                try:
-                    user_id = int(user_id_str)
-                except (ValueError, TypeError):
-                    return jsonify({"error": "Invalid user ID"}), 400
-                
-                # Fetch user from database
-                user = User.query.get(user_id)
-                
-                if not user:
-                    return jsonify({"error": "User not found"}), 404
-                
-                # Check if user has admin role
-                if not hasattr(user, 'role') or user.role != 'admin':
-                    return jsonify({"error": "Admin access required"}), 403
-                
-                return fn(*args, **kwargs)
-                
-            except Exception as e:
-                print(f"ERROR in admin_required: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                role = _authorized_role()
+            except AuthorizationError as e:
+                return jsonify({"error": e.message}), e.status
+            except Exception:
+                current_app.logger.exception("Authorization failed in admin_required")
                 return jsonify({"error": "Authorization failed"}), 500
-                
+
+            # Check if user has admin role
+            if role != 'admin':
+                return jsonify({"error": "Admin access required"}), 403
+
+            return fn(*args, **kwargs)
+
         return decorator
     return wrapper
 
@@ -53,24 +174,18 @@ def role_required(required_role):
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-                
-                user_id_str = get_jwt_identity()
-                user_id = int(user_id_str)
-                
-                user = User.query.get(user_id)
-                
-                if not user:
-                    return jsonify({"error": "User not found"}), 404
-                
-                if not hasattr(user, 'role') or user.role != required_role:
-                    return jsonify({"error": f"{required_role.capitalize()} access required"}), 403
-                
-                return fn(*args, **kwargs)
-            except Exception as e:
-                print(f"ERROR in role_required: {str(e)}")
+                role = _authorized_role()
+            except AuthorizationError as e:
+                return jsonify({"error": e.message}), e.status
+            except Exception:
+                current_app.logger.exception("Authorization failed in role_required")
                 return jsonify({"error": "Authorization failed"}), 500
-                
+
+            if role != required_role:
+                return jsonify({"error": f"{required_role.capitalize()} access required"}), 403
+
+            return fn(*args, **kwargs)
+
         return decorator
     return wrapper
 
@@ -83,23 +198,17 @@ def roles_required(*required_roles):
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-                
-                user_id_str = get_jwt_identity()
-                user_id = int(user_id_str)
-                
-                user = User.query.get(user_id)
-                
-                if not user:
-                    return jsonify({"error": "User not found"}), 404
-                
-                if not hasattr(user, 'role') or user.role not in required_roles:
-                    return jsonify({"error": "Insufficient permissions"}), 403
-                
-                return fn(*args, **kwargs)
-            except Exception as e:
-                print(f"ERROR in roles_required: {str(e)}")
+                role = _authorized_role()
+            except AuthorizationError as e:
+                return jsonify({"error": e.message}), e.status
+            except Exception:
+                current_app.logger.exception("Authorization failed in roles_required")
                 return jsonify({"error": "Authorization failed"}), 500
-                
+
+            if role not in required_roles:
+                return jsonify({"error": "Insufficient permissions"}), 403
+
+            return fn(*args, **kwargs)
+
         return decorator
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,155 @@
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from app.extensions import db
+from app.models import Donation, DonationRollup, Member
+from app.utils.money import to_decimal
+
+
+def month_start(on_date):
+    """
+    First day of the month for a donation date (today if unset).
+    """
+    if on_date is None:
+        on_date = datetime.utcnow().date()
+    if isinstance(on_date, datetime):
+        on_date = on_date.date()
+    return on_date.replace(day=1)
+
+
+def _month_expr(column):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.date(column, "start of month")
+    return func.cast(func.date_trunc("month", column), db.Date)
+
+
+# Rows per multi-row upsert, well under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+
+def adjust_rollups(changes):
+    """
+    Apply rollup adjustments given as (member_id, district_id, type, date,
+    amount, count) tuples (negative amount / count to remove). Changes to
+    the same member, type and month are summed first, then written with one
+    multi-row upsert where the database supports it. Rows left with no
+    donations are deleted, as a rebuild would never produce them.
+
+    Runs inside the caller's transaction, so the rollups commit together
+    with the donation change.
+    """
+    grouped = {}
+    for member_id, district_id, donation_type, on_date, amount, count in changes:
+        key = (member_id, donation_type or "tithe", month_start(on_date))
+        values = grouped.get(key)
+        if values is None:
+            grouped[key] = {
+                "member_id": key[0],
+                "district_id": district_id,
+                "type": key[1],
+                "month": key[2],
+                "total": to_decimal(amount),
+                "count": count,
+            }
+        else:
+            values["total"] += to_decimal(amount)
+            values["count"] += count
+    rows = list(grouped.values())
+    if not rows:
+        return
+
+    table = DonationRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        # Keys are unique after grouping, as Postgres requires of one upsert
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["member_id", "type", "month"],
+                set_={
+                    "total": table.c.total + stmt.excluded.total,
+                    "count": table.c.count + stmt.excluded.count,
+                }
+            )
+            db.session.execute(stmt)
+    else:
+        for values in rows:
+            updated = db.session.execute(
+                table.update()
+                .where(
+                    table.c.member_id == values["member_id"],
+                    table.c.type == values["type"],
+                    table.c.month == values["month"]
+                )
+                .values(total=table.c.total + values["total"], count=table.c.count + values["count"])
+            )
+            if updated.rowcount == 0:
+                db.session.execute(insert(table).values(**values))
+
+    removed = {values["member_id"] for values in rows if values["count"] < 0}
+    if removed:
+        db.session.execute(
+            table.delete().where(table.c.member_id.in_(removed), table.c.count <= 0)
+        )
+
+
+def adjust_rollup(member_id, district_id, donation_type, on_date, amount, count):
+    """
+    Add `amount` / `count` (negative to remove) to a member's monthly rollup.
+    """
+    adjust_rollups([(member_id, district_id, donation_type, on_date, amount, count)])
+
+
+def rollup_date(donation):
+    """
+    The day a donation counts towards: its date, else (legacy rows with no
+    date) the day it was recorded, as in rebuild_rollups. A row not yet
+    flushed has neither, and month_start's today is what the default stores.
+    """
+    return donation.date or donation.created_at
+
+
+def record_donation(donation, district_id):
+    adjust_rollup(donation.member_id, district_id, donation.type, rollup_date(donation), donation.amount, 1)
+
+
+def remove_donation(donation):
+    adjust_rollup(donation.member_id, None, donation.type, rollup_date(donation), -donation.amount, -1)
+
+
+def rebuild_rollups():
+    """
+    Recompute every rollup row from the donation table in one grouped query.
+    """
+    # Legacy rows without a date count in the month they were recorded
+    month = _month_expr(func.coalesce(Donation.date, Donation.created_at)).label("month")
+    donation_type = func.coalesce(Donation.type, "tithe").label("type")
+
+    grouped = (
+        select(
+            Donation.member_id,
+            func.min(Member.district_id),
+            donation_type,
+            month,
+            func.sum(Donation.amount),
+            func.count(Donation.id)
+        )
+        .join(Member, Member.id == Donation.member_id)
+        .where(func.coalesce(Donation.date, Donation.created_at).isnot(None))
+        .group_by(Donation.member_id, donation_type, month)
+    )
+
+    db.session.execute(DonationRollup.__table__.delete())
+    result = db.session.execute(
+        insert(DonationRollup.__table__).from_select(
+            ["member_id", "district_id", "type", "month", "total", "count"],
+            grouped
+        )
+    )
+    db.session.commit()
+    return result.rowcount
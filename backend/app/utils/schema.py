@@ -0,0 +1,35 @@
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import current_app
+from app.extensions import db
+
+
+class SchemaOutOfDateError(RuntimeError):
+    pass
+
+
+def check_schema_current(app):
+    """
+    Refuse to serve if the database isn't at the latest migration.
+
+    Called before serving (gunicorn.conf.py's on_starting hook and run.py),
+    never on import, so the Flask CLI can load the app and `flask db upgrade`
+    or `flask bootstrap` can still run against an old or empty database.
+    """
+    with app.app_context():
+        config = current_app.extensions["migrate"].migrate.get_config()
+        heads = set(ScriptDirectory.from_config(config).get_heads())
+
+        with db.engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+
+        # Don't hand a pooled connection to forked gunicorn workers
+        db.engine.dispose()
+
+    if current != heads:
+        found = ", ".join(sorted(current)) or "none"
+        expected = ", ".join(sorted(heads))
+        raise SchemaOutOfDateError(
+            f"Database schema is at revision {found} but the code expects {expected}. "
+            "Run `flask db upgrade` first."
+        )
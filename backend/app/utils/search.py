@@ -0,0 +1,271 @@
+import re
+from sqlalchemy import column, event, func, literal, literal_column, table, text
+from app.models import Member
+
+# Terms shorter than a trigram can't use the index and fall back to LIKE
+MIN_INDEXED_TERM = 3
+MAX_QUERY_LENGTH = 100
+# Candidates pulled from the index before fuzzy scoring in Python (SQLite)
+FUZZY_CANDIDATES = 200
+# Low enough to catch a swapped pair in a short word ("jhon" ~ 0.2 against
+# "john", where only the padded first letter is shared)
+FUZZY_THRESHOLD = 0.2
+
+# Weights for name, family, contact when ranking fuzzy candidates
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Leading space lets "% term%" match the start of the first word too
+POSTGRES_SEARCH_TEXT = (
+    "(' ' || coalesce(member.name, '') || ' ' || coalesce(member.family, '')"
+    " || ' ' || coalesce(member.contact, ''))"
+)
+
+
+def _sqlite_padded(column_name):
+    # pg_trgm pads every word ("  word "); FTS5 indexes raw text, so store it padded
+    return f"'  ' || replace(coalesce({column_name}, ''), ' ', '   ') || ' '"
+
+
+def _sqlite_index_row(prefix):
+    return ", ".join(_sqlite_padded(f"{prefix}.{c}") for c in ("name", "family", "contact"))
+
+
+SQLITE_DDL = [
+    # Contentless FTS5 table: the index only, rows stay in member. Not
+    # external-content, since the indexed text (padded) differs from member's
+    "CREATE VIRTUAL TABLE IF NOT EXISTS member_search USING fts5("
+    "name, family, contact, content='', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS member_search_ai AFTER INSERT ON member BEGIN "
+    "INSERT INTO member_search(rowid, name, family, contact) "
+    f"VALUES (new.id, {_sqlite_index_row('new')}); END",
+    "CREATE TRIGGER IF NOT EXISTS member_search_ad AFTER DELETE ON member BEGIN "
+    "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+    f"VALUES ('delete', old.id, {_sqlite_index_row('old')}); END",
+    "CREATE TRIGGER IF NOT EXISTS member_search_au AFTER UPDATE OF name, family, contact ON member BEGIN "
+    "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+    f"VALUES ('delete', old.id, {_sqlite_index_row('old')}); "
+    "INSERT INTO member_search(rowid, name, family, contact) "
+    f"VALUES (new.id, {_sqlite_index_row('new')}); END",
+    # Short queries match name prefixes; LIKE can only use a NOCASE index
+    "CREATE INDEX IF NOT EXISTS ix_member_name_nocase ON member (name COLLATE NOCASE)",
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # GIN trigram indexes are maintained by Postgres itself on every write
+    "CREATE INDEX IF NOT EXISTS ix_member_search_trgm ON member "
+    f"USING gin ({POSTGRES_SEARCH_TEXT.replace('member.', '')} gin_trgm_ops)",
+]
+
+
+member_search = table("member_search", column("rowid"))
+# The table name itself is the MATCH / bm25() operand
+_FTS = literal_column("member_search")
+
+
+# ---------------- INDEX DDL ----------------
+
+def _create_search_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS member_search"))
+
+
+def register_search_index():
+    """
+    Build the search index whenever db.create_all() creates the member table.
+    """
+    table = Member.__table__
+    if not event.contains(table, "after_create", _create_search_index):
+        event.listen(table, "after_create", _create_search_index)
+        event.listen(table, "before_drop", _drop_search_index)
+
+
+def include_name(name, type_, parent_names):
+    """
+    Keep the search index out of `flask db migrate` / `flask db check`; it
+    lives outside the models and is managed by its own migration.
+    """
+    if type_ == "table" and name.startswith("member_search"):
+        return False
+    if type_ == "index" and name in ("ix_member_search_trgm", "ix_member_name_nocase"):
+        return False
+    return True
+
+
+# ---------------- QUERY HELPERS ----------------
+
+def parse_terms(q):
+    """
+    Lower-cased search words from ?q=, validated.
+    """
+    q = (q or "").strip()
+    if not q:
+        raise ValueError("q is required")
+    if len(q) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    return q.lower().split()
+
+
+def _like_escape(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fts_match(expression):
+    return _FTS.op("MATCH")(expression)
+
+
+def _like(expression, pattern, dialect):
+    # SQLite's LIKE already ignores ASCII case; ilike's lower() calls only cost time
+    if dialect == "postgresql":
+        return expression.ilike(pattern, escape="\\")
+    return expression.like(pattern, escape="\\")
+
+
+def _word_prefix(search_text, term, dialect):
+    # Matches the term at the start of any word of name / family / contact
+    return _like(search_text, f"% {_like_escape(term)}%", dialect)
+
+
+def _sqlite_search_text():
+    return (
+        literal_column("' '") + func.coalesce(Member.name, "") + " "
+        + func.coalesce(Member.family, "") + " " + func.coalesce(Member.contact, "")
+    )
+
+
+def prefix_search(query, terms, dialect, offset, limit):
+    """
+    Rows of `query` (selecting from member) where every term starts a word of
+    name, family or contact. Names starting with the query rank first, then
+    other name matches, then family / contact matches, alphabetically within
+    each. Returns up to limit + 1 rows from `offset` so the caller can tell
+    whether there's another page.
+    """
+    first = _like_escape(terms[0])
+    starts_name = _like(Member.name, f"{first}%", dialect)
+    in_name = _like(literal_column("' '") + Member.name, f"% {first}%", dialect)
+
+    if dialect == "postgresql":
+        search_text = literal_column(POSTGRES_SEARCH_TEXT)
+    elif any(len(t) >= MIN_INDEXED_TERM for t in terms):
+        # The trigram index narrows to substring hits, LIKE keeps word prefixes
+        indexed = [t for t in terms if len(t) >= MIN_INDEXED_TERM]
+        search_text = _sqlite_search_text()
+        query = query.join(member_search, member_search.c.rowid == Member.id).filter(
+            _fts_match(" AND ".join(_fts_phrase(t) for t in indexed))
+        )
+    else:
+        # One or two characters have no trigram; walk names in the NOCASE index
+        query = query.filter(starts_name)
+        query = query.filter(*[_word_prefix(_sqlite_search_text(), t, dialect) for t in terms[1:]])
+        query = query.order_by(Member.name.collate("NOCASE"), Member.id)
+        return query.offset(offset).limit(limit + 1).all()
+
+    query = query.filter(*[_word_prefix(search_text, t, dialect) for t in terms])
+    query = query.order_by(starts_name.desc(), in_name.desc(), Member.name, Member.id)
+    return query.offset(offset).limit(limit + 1).all()
+
+
+def _trigrams(text_value):
+    """
+    pg_trgm style trigrams: each word padded with two spaces before, one after.
+    """
+    grams = set()
+    for word in re.findall(r"\w+", (text_value or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _word_similarity(grams, word):
+    """
+    pg_trgm word_similarity of a term's trigrams against one word: the best
+    contiguous run of the word's trigrams, so a shared first letter still
+    counts for a typo further in.
+    """
+    padded = f"  {word} "
+    ordered = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    best = 0.0
+    for start in range(len(ordered)):
+        seen = set()
+        shared = 0
+        for gram in ordered[start:]:
+            if gram not in seen:
+                seen.add(gram)
+                shared += gram in grams
+            best = max(best, shared / (len(grams) + len(seen) - shared))
+    return best
+
+
+def fuzzy_score(terms, *values):
+    """
+    Mean over terms of each term's best word_similarity to any word in
+    `values`, as Postgres scores it word by word.
+    """
+    words = [w for v in values for w in re.findall(r"\w+", (v or "").lower())]
+    if not words:
+        return 0.0
+    total = 0.0
+    for term in terms:
+        grams = _trigrams(term)
+        if grams:
+            total += max(_word_similarity(grams, w) for w in words)
+    return total / len(terms)
+
+
+def fuzzy_search(query, terms, dialect, offset, limit):
+    """
+    Typo-tolerant matching, same paging contract as prefix_search. Postgres
+    ranks by word_similarity in SQL; SQLite pulls trigram-overlap candidates
+    from the FTS index and re-scores them in Python.
+    """
+    q = " ".join(terms)
+
+    if dialect == "postgresql":
+        # <% is the index-backed "word similarity above threshold" operator;
+        # use the same threshold as SQLite for this transaction only
+        query.session.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+            {"t": str(FUZZY_THRESHOLD)}
+        )
+        search_text = literal_column(POSTGRES_SEARCH_TEXT)
+        query = query.filter(literal(q).op("<%")(search_text)).order_by(
+            func.word_similarity(q, search_text).desc(),
+            Member.id
+        )
+        return query.offset(offset).limit(limit + 1).all()
+
+    # Padded like the index, so word starts and ends count as in pg_trgm
+    grams = set()
+    for term in terms:
+        grams.update(_trigrams(term))
+    if not grams:
+        return []
+
+    candidates = (
+        query.add_columns(Member.name, Member.family, Member.contact)
+        .join(member_search, member_search.c.rowid == Member.id)
+        .filter(_fts_match(" OR ".join(_fts_phrase(g) for g in sorted(grams))))
+        .order_by(func.bm25(_FTS, *BM25_WEIGHTS))
+        .limit(FUZZY_CANDIDATES)
+        .all()
+    )
+
+    scored = []
+    for row in candidates:
+        score = fuzzy_score(terms, *row[-3:])
+        if score >= FUZZY_THRESHOLD:
+            scored.append((score, row))
+    # Stable sort, so equal scores keep the index's bm25 order
+    scored.sort(key=lambda entry: -entry[0])
+    return [row for _, row in scored[offset:offset + limit + 1]]
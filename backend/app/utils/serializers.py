@@ -0,0 +1,198 @@
+from flask import request
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models import (
+    Member, District, Sacrament, Event, EventSeries, Donation, DonationBatch, Announcement, Job
+)
+
+
+class Serializer:
+    """
+    Column-level serializer for one model.
+
+    `fields` maps output names to columns or SQL expressions; `default` is the
+    set returned when the request has no ?fields=. Queries select only the
+    requested columns, so rows come back as plain tuples instead of ORM
+    entities. Dates are left as date objects for the JSON provider to encode.
+    """
+
+    def __init__(self, model, fields, default=None):
+        self.model = model
+        self.fields = fields
+        self.default = list(default or fields)
+
+    def requested(self, default=None):
+        """
+        Field names from ?fields=id,name, or the default set.
+        """
+        raw = request.args.get("fields")
+        if not raw:
+            return list(default or self.default)
+
+        names = list(dict.fromkeys(n.strip() for n in raw.split(",") if n.strip()))
+        unknown = [n for n in names if n not in self.fields]
+        if unknown or not names:
+            allowed = ", ".join(self.fields)
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Use any of: {allowed}")
+        return names
+
+    def query(self, names, *extra_columns):
+        """
+        Query selecting `names` first, then any `extra_columns` (e.g. the id
+        and sort columns keyset paging reads) that aren't already included.
+        """
+        columns = [self.fields[n].label(n) for n in names]
+        columns += [c for c in extra_columns if c.key not in names]
+        return db.session.query(*columns).select_from(self.model)
+
+    @staticmethod
+    def dump(rows, names):
+        # zip stops at the requested fields, dropping the paging-only extras
+        return [dict(zip(names, row)) for row in rows]
+
+    def dump_object(self, obj, names=None):
+        """
+        Serialize an entity that's already loaded, e.g. right after a write.
+        """
+        return {n: getattr(obj, n) for n in (names or self.default)}
+
+
+member_serializer = Serializer(
+    Member,
+    {
+        "id": Member.id,
+        "name": Member.name,
+        "contact": Member.contact,
+        "address": Member.address,
+        "family": Member.family,
+        "status": Member.status,
+        "district_id": Member.district_id,
+        "user_id": Member.user_id,
+        "created_at": Member.created_at,
+    },
+    default=["id", "name", "contact", "address", "family", "status"]
+)
+
+district_serializer = Serializer(
+    District,
+    {
+        "id": District.id,
+        "name": District.name,
+        "leader_name": District.leader_name,
+        "description": District.description,
+        "created_at": District.created_at,
+        # Correlated count, only evaluated when the field is asked for
+        "member_count": (
+            select(func.count(Member.id))
+            .where(Member.district_id == District.id)
+            .correlate(District)
+            .scalar_subquery()
+        ),
+    },
+    default=["id", "name", "leader_name", "description", "member_count"]
+)
+
+sacrament_serializer = Serializer(
+    Sacrament,
+    {
+        "id": Sacrament.id,
+        "user_id": Sacrament.user_id,
+        "member_id": Sacrament.member_id,
+        "type": Sacrament.type,
+        "date": Sacrament.date,
+        "certificate_path": Sacrament.certificate_path,
+        "created_at": Sacrament.created_at,
+    },
+    default=["id", "user_id", "member_id", "type", "date", "certificate_path"]
+)
+
+event_serializer = Serializer(
+    Event,
+    {
+        "id": Event.id,
+        "name": Event.name,
+        "description": Event.description,
+        "date": Event.date,
+        "created_at": Event.created_at,
+    }
+)
+
+event_series_serializer = Serializer(
+    EventSeries,
+    {
+        "id": EventSeries.id,
+        "name": EventSeries.name,
+        "description": EventSeries.description,
+        "rrule": EventSeries.rrule,
+        "start_date": EventSeries.start_date,
+        "end_date": EventSeries.end_date,
+        "exdates": EventSeries.exdates,
+        "created_at": EventSeries.created_at,
+    },
+    default=["id", "name", "description", "rrule", "start_date", "end_date", "exdates"]
+)
+
+donation_serializer = Serializer(
+    Donation,
+    {
+        "id": Donation.id,
+        "member_id": Donation.member_id,
+        "amount": Donation.amount,
+        "type": Donation.type,
+        "date": Donation.date,
+        "created_at": Donation.created_at,
+        "batch_id": Donation.batch_id,
+    },
+    default=["id", "member_id", "amount", "type", "date", "created_at"]
+)
+
+batch_serializer = Serializer(
+    DonationBatch,
+    {
+        "id": DonationBatch.id,
+        "label": DonationBatch.label,
+        "date": DonationBatch.date,
+        "total": DonationBatch.total,
+        "count": DonationBatch.count,
+        "status": DonationBatch.status,
+        "created_by": DonationBatch.created_by,
+        "created_at": DonationBatch.created_at,
+        "voided_at": DonationBatch.voided_at,
+    }
+)
+
+announcement_serializer = Serializer(
+    Announcement,
+    {
+        "id": Announcement.id,
+        "title": Announcement.title,
+        "message": Announcement.message,
+        "category": Announcement.category,
+        "district_id": Announcement.district_id,
+        "publish_date": Announcement.publish_date,
+        "expiry_date": Announcement.expiry_date,
+        "created_at": Announcement.created_at,
+    },
+    default=["id", "title", "message", "category", "district_id", "publish_date", "expiry_date"]
+)
+
+job_serializer = Serializer(
+    Job,
+    {
+        "id": Job.id,
+        "kind": Job.kind,
+        "status": Job.status,
+        "params": Job.params,
+        "result": Job.result,
+        "error": Job.error,
+        "progress": Job.progress,
+        "cancel_requested": Job.cancel_requested,
+        "worker": Job.worker,
+        "created_by": Job.created_by,
+        "created_at": Job.created_at,
+        "started_at": Job.started_at,
+        "heartbeat_at": Job.heartbeat_at,
+        "finished_at": Job.finished_at,
+    },
+    default=["id", "kind", "status", "progress", "error", "created_by", "created_at", "started_at", "finished_at"]
+)
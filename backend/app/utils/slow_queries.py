@@ -0,0 +1,127 @@
+import itertools
+import logging
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import has_request_context, request
+from app.utils.query_timing import on_query
+
+logger = logging.getLogger("app.slow_queries")
+
+settings = {
+    "threshold_ms": 200.0,
+    "explain": True,
+    "analyze_sample": 0.0,  # fraction of slow Postgres SELECTs re-run with EXPLAIN ANALYZE
+}
+
+_entries = deque(maxlen=100)
+_entries_lock = threading.Lock()
+_ids = itertools.count(1)
+
+# One background thread runs EXPLAINs so the slow request isn't made slower
+_explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_pending = threading.BoundedSemaphore(10)
+
+
+def _redact(parameters):
+    """
+    Keep parameter names and types, never values.
+    """
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return None
+
+
+def _explain(entry, engine, statement, parameters):
+    try:
+        dialect = engine.dialect.name
+        if dialect == "sqlite":
+            sql, analyzed = f"EXPLAIN QUERY PLAN {statement}", False
+        elif dialect == "postgresql":
+            analyzed = random.random() < settings["analyze_sample"]
+            prefix = "EXPLAIN (ANALYZE, BUFFERS)" if analyzed else "EXPLAIN"
+            sql = f"{prefix} {statement}"
+        else:
+            return
+
+        # Separate connection so a failing EXPLAIN can't poison the request's transaction
+        with engine.connect() as connection:
+            connection = connection.execution_options(slow_query_log=False)
+            rows = connection.exec_driver_sql(sql, parameters).all()
+            connection.rollback()
+
+        if dialect == "sqlite":
+            plan = [row[-1] for row in rows]
+        else:
+            plan = [row[0] for row in rows]
+
+        with _entries_lock:
+            entry["plan"] = plan
+            entry["analyzed"] = analyzed
+    except Exception as e:
+        with _entries_lock:
+            entry["plan_error"] = str(e)
+    finally:
+        _pending.release()
+
+
+def _check_query(conn, statement, parameters, context, executemany, elapsed):
+    duration_ms = elapsed * 1000
+
+    if duration_ms < settings["threshold_ms"]:
+        return
+    if context is not None and not context.execution_options.get("slow_query_log", True):
+        return
+
+    entry = {
+        "id": next(_ids),
+        "recorded_at": datetime.utcnow().isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "parameters": _redact(parameters) if not executemany else "executemany",
+        "endpoint": request.endpoint if has_request_context() else None,
+        "plan": None,
+        "analyzed": False,
+    }
+    with _entries_lock:
+        _entries.append(entry)
+
+    logger.warning("Slow query (%.1f ms) in %s: %s", duration_ms, entry["endpoint"], statement)
+
+    is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    if settings["explain"] and is_select and not executemany and _pending.acquire(blocking=False):
+        _explainer.submit(_explain, entry, conn.engine, statement, parameters)
+
+
+def init_slow_query_log(app):
+    """
+    Configure from the environment and hook every engine's cursor execution.
+
+    SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_ANALYZE_SAMPLE, SLOW_QUERY_LOG_SIZE.
+    """
+    global _entries
+    settings["threshold_ms"] = float(os.getenv("SLOW_QUERY_MS", settings["threshold_ms"]))
+    settings["explain"] = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes", "on")
+    settings["analyze_sample"] = float(os.getenv("SLOW_QUERY_ANALYZE_SAMPLE", settings["analyze_sample"]))
+
+    size = int(os.getenv("SLOW_QUERY_LOG_SIZE", _entries.maxlen))
+    if size != _entries.maxlen:
+        with _entries_lock:
+            _entries = deque(_entries, maxlen=size)
+
+    on_query(_check_query)
+
+
+def recent_slow_queries():
+    with _entries_lock:
+        return [dict(e) for e in reversed(_entries)]
+
+
+def clear_slow_queries():
+    with _entries_lock:
+        _entries.clear()
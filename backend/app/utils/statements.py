@@ -0,0 +1,369 @@
+import io
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
+from itertools import groupby
+from flask import current_app
+from jinja2 import Environment
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Donation, Member
+
+DEFAULT_PARISH_NAME = "St. Michael Parish"
+DEFAULT_STATEMENT_WORKERS = min(4, os.cpu_count() or 1)
+# Members handed to a worker per task; large enough to amortise pickling
+STATEMENT_CHUNK = 250
+# Grouped rows fetched from the database per round trip
+STATEMENT_FETCH = 2000
+PROGRESS_FILE = "progress.json"
+
+TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{ year }} Giving Statement - {{ member.name }}</title>
+<style>
+body { font-family: Georgia, serif; max-width: 42em; margin: 2em auto; color: #222; }
+table { width: 100%; border-collapse: collapse; margin: 1.5em 0; }
+th, td { padding: .4em; border-bottom: 1px solid #ccc; text-align: left; }
+td.amount, th.amount { text-align: right; }
+tfoot td { font-weight: bold; border-top: 2px solid #222; }
+@media print { body { margin: 0; } }
+</style>
+</head>
+<body>
+<h1>{{ parish }}</h1>
+<h2>Statement of Contributions, {{ year }}</h2>
+<p>
+<strong>{{ member.name }}</strong><br>
+{% if member.family %}{{ member.family }}<br>{% endif %}
+{% if member.address %}{{ member.address }}<br>{% endif %}
+Member no. {{ member.id }}
+</p>
+<table>
+<thead><tr><th>Type</th><th class="amount">Gifts</th><th>Period</th><th class="amount">Amount</th></tr></thead>
+<tbody>
+{% for line in member.lines %}
+<tr><td>{{ line.type|title }}</td><td class="amount">{{ line.count }}</td>
+<td>{{ line.first }} to {{ line.last }}</td><td class="amount">{{ "{:,.2f}".format(line.total) }}</td></tr>
+{% endfor %}
+</tbody>
+<tfoot><tr><td>Total</td><td class="amount">{{ member.count }}</td><td></td>
+<td class="amount">{{ "{:,.2f}".format(member.total) }}</td></tr></tfoot>
+</table>
+<p>Thank you for your generosity. No goods or services were provided in exchange for these contributions.</p>
+<p><small>Issued {{ issued }}</small></p>
+</body>
+</html>
+"""
+
+# Compiled once per worker process
+_template = None
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        _template = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(TEMPLATE)
+    return _template
+
+
+def statements_root():
+    return (
+        current_app.config.get("STATEMENTS_DIR")
+        or os.getenv("STATEMENTS_DIR")
+        or os.path.join(current_app.instance_path, "statements")
+    )
+
+
+def statement_dir(year, root=None):
+    return os.path.join(root or statements_root(), str(year))
+
+
+def statement_filename(year, member_id):
+    return f"statement-{year}-{member_id:06d}.html"
+
+
+def parish_name():
+    return current_app.config.get("PARISH_NAME") or os.getenv("PARISH_NAME") or DEFAULT_PARISH_NAME
+
+
+# ---------------- DATA ----------------
+
+def _year_bounds(year):
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def giving_query(year):
+    """
+    One grouped query: each member's total, count and date span per type for
+    the year, ordered by member so statements can be assembled while streaming.
+    """
+    start, end = _year_bounds(year)
+    donation_type = func.coalesce(Donation.type, "tithe").label("type")
+    return (
+        db.session.query(
+            Member.id,
+            Member.name,
+            Member.family,
+            Member.address,
+            donation_type,
+            func.sum(Donation.amount).label("total"),
+            func.count(Donation.id).label("count"),
+            func.min(Donation.date).label("first"),
+            func.max(Donation.date).label("last")
+        )
+        .join(Donation, Donation.member_id == Member.id)
+        .filter(Donation.date >= start, Donation.date < end)
+        .group_by(Member.id, donation_type)
+        .order_by(Member.id, donation_type)
+    )
+
+
+def count_givers(year):
+    start, end = _year_bounds(year)
+    return (
+        db.session.query(func.count(func.distinct(Donation.member_id)))
+        .filter(Donation.date >= start, Donation.date < end)
+        .scalar()
+    )
+
+
+def _iso(value):
+    # SQLite hands back min()/max() of a date column as text
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def iter_statements(rows):
+    """
+    Fold the grouped rows into one plain dict per member (picklable for the pool).
+    """
+    for member_id, lines in groupby(rows, key=lambda r: r.id):
+        lines = list(lines)
+        first = lines[0]
+        yield {
+            "id": member_id,
+            "name": first.name,
+            "family": first.family,
+            "address": first.address,
+            "total": sum(line.total for line in lines),
+            "count": sum(int(line.count or 0) for line in lines),
+            "lines": [
+                {
+                    "type": line.type,
+                    "total": line.total,
+                    "count": int(line.count or 0),
+                    "first": _iso(line.first),
+                    "last": _iso(line.last),
+                }
+                for line in lines
+            ],
+        }
+
+
+# ---------------- RENDERING ----------------
+
+def render_statement(statement, year, parish, issued):
+    return _get_template().render(member=statement, year=year, parish=parish, issued=issued)
+
+
+def _render_chunk(directory, year, parish, issued, statements):
+    """
+    Worker entry point: render and write a chunk of statements. Each file is
+    written to a temp name and renamed, so an interrupted run never leaves a
+    half-written statement behind to be skipped on resume.
+    """
+    for statement in statements:
+        path = os.path.join(directory, statement_filename(year, statement["id"]))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_statement(statement, year, parish, issued))
+        os.replace(tmp_path, path)
+    return len(statements)
+
+
+# ---------------- PROGRESS ----------------
+
+def read_progress(year, root=None):
+    try:
+        with open(os.path.join(statement_dir(year, root), PROGRESS_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_progress(directory, state):
+    path = os.path.join(directory, PROGRESS_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_running(year, root=None):
+    """
+    True while a run for `year` is in progress in any process; a run leaves
+    its live pid in progress.json.
+    """
+    state = read_progress(year, root)
+    return bool(state and state.get("status") == "running" and state.get("pid") and _pid_alive(state["pid"]))
+
+
+# ---------------- RUNS ----------------
+
+def generate_statements(year, root=None, workers=None, resume=True, progress=None):
+    """
+    Write one HTML statement per member who gave in `year` to
+    <root>/<year>/, rendering across a process pool.
+
+    With `resume`, members whose statement file already exists are skipped,
+    so a failed or interrupted run picks up where it stopped. Progress is
+    kept in progress.json next to the statements. `workers=0` renders
+    in-process. Returns the final progress state.
+    """
+    directory = statement_dir(year, root)
+    os.makedirs(directory, exist_ok=True)
+    workers = DEFAULT_STATEMENT_WORKERS if workers is None else workers
+    parish = parish_name()
+    issued = date.today().isoformat()
+
+    existing = set()
+    if resume:
+        existing = {name for name in os.listdir(directory) if name.endswith(".html")}
+
+    state = {
+        "year": year,
+        "status": "running",
+        "pid": os.getpid(),
+        "total": count_givers(year),
+        "done": 0,
+        "skipped": 0,
+        "started_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+        "error": None,
+    }
+    _write_progress(directory, state)
+    last_report = 0.0
+
+    def report(force=False):
+        nonlocal last_report
+        now = time.monotonic()
+        if force or now - last_report >= 1:
+            last_report = now
+            _write_progress(directory, state)
+            if progress:
+                progress(state)
+
+    # Bounded in-flight chunks keep memory flat however many members there are
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = set()
+
+    def drain(block_until):
+        nonlocal pending
+        while len(pending) > block_until:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                state["done"] += future.result()
+            report()
+
+    def submit(chunk):
+        if pool is None:
+            state["done"] += _render_chunk(directory, year, parish, issued, chunk)
+            report()
+            return
+        drain(workers * 2 - 1)
+        pending.add(pool.submit(_render_chunk, directory, year, parish, issued, chunk))
+
+    try:
+        chunk = []
+        rows = giving_query(year).yield_per(STATEMENT_FETCH)
+        for statement in iter_statements(rows):
+            if statement_filename(year, statement["id"]) in existing:
+                state["skipped"] += 1
+                continue
+            chunk.append(statement)
+            if len(chunk) >= STATEMENT_CHUNK:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+        drain(0)
+        state["status"] = "complete"
+    except BaseException as e:
+        for future in pending:
+            future.cancel()
+        state["status"] = "failed"
+        state["error"] = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        state["finished_at"] = datetime.utcnow().isoformat()
+        report(force=True)
+
+    return state
+
+
+# ---------------- ZIP ----------------
+
+class _ZipStream(io.RawIOBase):
+    """
+    Write-only sink for ZipFile; zipfile sees it can't seek and writes data
+    descriptors instead, so the archive can be streamed as it's built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def statement_files(year, root=None):
+    directory = statement_dir(year, root)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(".html"))
+
+
+def iter_zip(year, root=None):
+    """
+    Yield a ZIP of the year's statements chunk by chunk, one file at a time.
+    """
+    directory = statement_dir(year, root)
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in statement_files(year, root):
+            archive.write(os.path.join(directory, name), arcname=f"{year}/{name}")
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_zip(year, path, root=None):
+    with open(path, "wb") as f:
+        for data in iter_zip(year, root):
+            f.write(data)
@@ -0,0 +1,482 @@
+"""
+Load benchmark over a synthetic large parish.
+
+    python benchmarks/load.py --members 100000 --donations-per-year 20 \
+        --requests 2000 --concurrency 8 --save-baseline benchmarks/baseline.json
+
+    python benchmarks/load.py --compare benchmarks/baseline.json
+    python benchmarks/load.py --gunicorn --workers 1      # real server instead of the test client
+
+The dataset is built once per --db file (pass --rebuild to recreate it) by
+app.utils.datagen with a fixed --seed, so runs are comparable. Every route in app/routes is exercised
+through a weighted, read-heavy mix; writes create and remove their own rows so
+the dataset doesn't drift. Per-endpoint p50/p95/p99 latency, throughput, SQL
+statements per request (scraped from /metrics) and peak RSS are reported.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ADMIN_EMAIL = "bench-admin@church.com"
+MEMBER_EMAIL = "bench-member@church.com"
+PASSWORD = "bench-password"
+
+
+# ---------------- DATASET ----------------
+
+def build_dataset(app, args):
+    from flask_migrate import stamp
+    from app.extensions import db
+    from app.utils.datagen import generate
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        stamp()
+        generate(
+            members=args.members,
+            districts=args.districts,
+            years=args.years,
+            donations_per_year=args.donations_per_year,
+            seed=args.seed,
+            # The scenarios read windows around today (calendar, active feed)
+            anchor_date=date.today(),
+        )
+
+
+def ensure_users(app):
+    from app.extensions import db
+    from app.models import User, Member
+    from app.utils.passwords import hash_password
+
+    with app.app_context():
+        for email, role in ((ADMIN_EMAIL, "admin"), (MEMBER_EMAIL, "member")):
+            if not User.query.filter_by(email=email).first():
+                db.session.add(User(name=role, email=email, role=role, password_hash=hash_password(PASSWORD)))
+        db.session.commit()
+
+        member_user = User.query.filter_by(email=MEMBER_EMAIL).first()
+        if not member_user.member:
+            db.session.get(Member, 1).user_id = member_user.id
+            db.session.commit()
+
+
+# ---------------- CLIENTS ----------------
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, token=None, json_body=None):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.get_json(silent=True), response.get_data(as_text=True)
+
+
+class HttpDriver:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, path, token=None, json_body=None):
+        data = json.dumps(json_body).encode() if json_body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        if token:
+            req.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(req) as response:
+                status, text = response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            status, text = e.code, e.read().decode()
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = None
+        return status, body, text
+
+
+# ---------------- WORKLOAD ----------------
+
+def build_mix(members, districts):
+    """
+    (weight, name, callable(driver, tokens, rng)) covering every route.
+    """
+    from app.utils.datagen import FAMILY_NAMES, FIRST_NAMES
+
+    created = {"donations": [], "events": [], "announcements": [], "districts": [], "members": [],
+               "sacraments": [], "own_donations": []}
+    lock = threading.Lock()
+
+    def push(kind, value):
+        with lock:
+            created[kind].append(value)
+
+    def pop(kind):
+        with lock:
+            return created[kind].pop() if created[kind] else None
+
+    def member_id(rng):
+        return rng.randint(1, members)
+
+    def get(path, auth=None):
+        return lambda d, t, rng: d.request("GET", path(rng) if callable(path) else path, t.get(auth))
+
+    def add_donation(d, t, rng):
+        status, body, _ = d.request("POST", "/donations/admin/add", t["admin"], {
+            "member_id": member_id(rng), "amount": 250, "type": "offering", "date": date.today().isoformat()})
+        if status == 201:
+            push("donations", body["donation"]["id"])
+        return status, body, None
+
+    def update_donation(d, t, rng):
+        # Claim the row so a concurrent delete can't remove it mid-update
+        donation_id = pop("donations")
+        if donation_id is None:
+            return add_donation(d, t, rng)
+        result = d.request("PUT", f"/donations/admin/{donation_id}", t["admin"], {"amount": 300})
+        push("donations", donation_id)
+        return result
+
+    def delete_donation(d, t, rng):
+        donation_id = pop("donations")
+        if donation_id is None:
+            return add_donation(d, t, rng)
+        return d.request("DELETE", f"/donations/admin/{donation_id}", t["admin"])
+
+    def own_donation(d, t, rng):
+        status, body, _ = d.request("POST", "/donations/", t["member"], {"amount": 100, "type": "tithe"})
+        if status == 201:
+            push("own_donations", body["donation"]["id"])
+        return status, body, None
+
+    def delete_own_donation(d, t, rng):
+        donation_id = pop("own_donations")
+        if donation_id is None:
+            return own_donation(d, t, rng)
+        return d.request("DELETE", f"/donations/{donation_id}", t["member"])
+
+    def batch(d, t, rng):
+        status, body, _ = d.request("POST", "/donations/admin/batch", t["admin"], {
+            "date": date.today().isoformat(), "label": "bench",
+            "donations": [{"member_id": member_id(rng), "amount": 50} for _ in range(50)]})
+        if status == 201:
+            batch_id = body["batch"]["id"]
+            d.request("GET", f"/donations/admin/batch/{batch_id}", t["admin"])
+            return d.request("POST", f"/donations/admin/batch/{batch_id}/void", t["admin"])
+        return status, body, None
+
+    def create_and_delete(kind, create_path, payload, delete_path, update=None):
+        def run(d, t, rng):
+            status, body, _ = d.request("POST", create_path, t["admin"], payload(rng))
+            if status != 201:
+                return status, body, None
+            new_id = body["id"]
+            if update:
+                d.request("PUT", f"{delete_path}{new_id}", t["admin"], update)
+            return d.request("DELETE", f"{delete_path}{new_id}", t["admin"])
+        return run
+
+    def sacrament(d, t, rng):
+        status, body, _ = d.request("POST", "/sacraments/admin/add", t["admin"], {
+            "user_id": t["member_user_id"], "type": "Confirmation", "date": "2024-05-01"})
+        if status == 201:
+            return d.request("DELETE", f"/sacraments/admin/{body['sacrament']['id']}", t["admin"])
+        return status, body, None
+
+    def import_members(d, t, rng):
+        return d.request("POST", "/members/import", t["admin"], [
+            {"name": f"Imported {rng.random()}", "district_id": district_id(rng)} for _ in range(20)])
+
+    def register_and_link(d, t, rng):
+        email = f"bench-{uuid.uuid4().hex}@church.com"
+        return d.request("POST", "/auth/register", None, {"name": "Bench", "email": email, "password": "pw"})
+
+    def district_id(rng):
+        return rng.randint(1, districts)
+
+    def search_prefix(rng):
+        return f"/members/search?mode=prefix&limit=20&q={rng.choice(FAMILY_NAMES)[:4]}"
+
+    def search_typo(rng):
+        # A generated name with two adjacent letters swapped, e.g. "Jospeh Kamau"
+        first = rng.choice(FIRST_NAMES)
+        i = rng.randrange(1, len(first) - 1)
+        typo = first[:i] + first[i + 1] + first[i] + first[i + 2:]
+        q = urllib.parse.quote(f"{typo} {rng.choice(FAMILY_NAMES)}")
+        return f"/members/search?mode=fuzzy&limit=20&q={q}"
+
+    return [
+        (12, "members.list", get(lambda rng: "/members/?limit=50")),
+        (4, "members.list_filtered", get(lambda rng: f"/members/?limit=50&status=active&district_id={district_id(rng)}")),
+        (4, "members.search", get(search_prefix)),
+        (2, "members.search_fuzzy", get(search_typo)),
+        (8, "members.get", get(lambda rng: f"/members/{member_id(rng)}")),
+        (4, "members.profile", get(lambda rng: f"/members/{member_id(rng)}/profile", "admin")),
+        (8, "districts.list", get("/districts/")),
+        (4, "districts.get", get(lambda rng: f"/districts/{district_id(rng)}?limit=50")),
+        (10, "announcements.list", get("/announcements/?limit=20")),
+        (10, "announcements.active", get(lambda rng: f"/announcements/active?district_id={district_id(rng)}")),
+        (3, "announcements.get", get("/announcements/1")),
+        (8, "events.list", get("/events/?limit=20", "admin")),
+        (6, "events.calendar", get(lambda rng: "/events/calendar?date_from={}&date_to={}".format(
+            date.today(), date.today() + timedelta(weeks=5)), "member")),
+        (6, "donations.list", get(lambda rng: f"/donations/?limit=100&member_id={member_id(rng)}", "admin")),
+        (6, "donations.my", get("/donations/my-donations", "member")),
+        (3, "donations.summary", get("/donations/summary?period=month&group_by=type", "admin")),
+        (1, "donations.export", get(lambda rng: f"/donations/export?format=ndjson&member_id={member_id(rng)}", "admin")),
+        (2, "donations.batches", get("/donations/admin/batch", "admin")),
+        (3, "sacraments.all", get("/sacraments/admin/all?limit=100", "admin")),
+        (4, "sacraments.my", get("/sacraments/", "member")),
+        (4, "auth.me", get("/auth/me", "member")),
+        (1, "admin.pool", get("/admin/pool", "admin")),
+        (1, "admin.slow_queries", get("/admin/slow-queries", "admin")),
+        (3, "donations.add", add_donation),
+        (1, "donations.update", update_donation),
+        (2, "donations.delete", delete_donation),
+        (2, "donations.own_add", own_donation),
+        (1, "donations.own_delete", delete_own_donation),
+        (1, "donations.batch", batch),
+        (1, "sacraments.add_delete", sacrament),
+        (1, "events.crud", create_and_delete(
+            "events", "/events/", lambda rng: {"name": "Bench", "date": date.today().isoformat()},
+            "/events/", {"description": "updated"})),
+        (1, "announcements.crud", create_and_delete(
+            "announcements", "/announcements/", lambda rng: {"title": "Bench", "message": "m"},
+            "/announcements/", {"message": "updated"})),
+        (1, "districts.crud", create_and_delete(
+            "districts", "/districts/", lambda rng: {"name": f"Bench {rng.getrandbits(48)}"},
+            "/districts/", {"description": "updated"})),
+        (1, "members.crud", create_and_delete(
+            "members", "/members/", lambda rng: {"name": "Bench"}, "/members/", {"family": "Bench"})),
+        (1, "members.import", import_members),
+        (1, "auth.register", register_and_link),
+    ]
+
+
+def login(driver, email):
+    status, body, _ = driver.request("POST", "/auth/login", None, {"email": email, "password": PASSWORD})
+    if status != 200:
+        raise SystemExit(f"Login failed for {email}: {status} {body}")
+    return body["access_token"], body["user"]["id"]
+
+
+def run_workload(driver, members, districts, total_requests, concurrency, seed):
+    admin_token, _ = login(driver, ADMIN_EMAIL)
+    member_token, member_user_id = login(driver, MEMBER_EMAIL)
+    tokens = {"admin": admin_token, "member": member_token, "member_user_id": member_user_id}
+
+    mix = build_mix(members, districts)
+    weights = [w for w, _, _ in mix]
+    rng = random.Random(seed)
+    plan = rng.choices(range(len(mix)), weights=weights, k=total_requests)
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def one(args):
+        index, request_seed = args
+        _, name, action = mix[index]
+        started = time.perf_counter()
+        status, _, _ = action(driver, tokens, random.Random(request_seed))
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies[name].append(elapsed * 1000)
+            if status >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, [(i, rng.getrandbits(32)) for i in plan]))
+    wall = time.perf_counter() - started
+
+    return latencies, errors, wall, tokens
+
+
+def scrape_query_counts(driver):
+    _, _, text = driver.request("GET", "/metrics")
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        match = re.match(r'db_queries_per_request_(sum|count)\{endpoint="([^"]+)"\} ([\d.]+)', line)
+        if match:
+            target = sums if match.group(1) == "sum" else counts
+            target[match.group(2)] = float(match.group(3))
+    return {e: sums[e] / counts[e] for e in counts if counts[e]}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def peak_rss_mb(server_pids=()):
+    if not server_pids:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    peak = 0
+    for pid in server_pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peak = max(peak, int(line.split()[1]) / 1024)
+        except OSError:
+            pass
+    return peak
+
+
+def server_pids(master_pid):
+    pids = [master_pid]
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+# ---------------- REPORT ----------------
+
+def summarize(latencies, errors, wall, query_counts, rss_mb):
+    routes = {}
+    for name, values in sorted(latencies.items()):
+        routes[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+        }
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "total_requests": total,
+        "throughput_rps": round(total / wall, 1) if wall else 0,
+        "peak_rss_mb": round(rss_mb, 1),
+        "routes": routes,
+        "queries_per_request": {k: round(v, 2) for k, v in sorted(query_counts.items())},
+    }
+
+
+def print_report(result, baseline=None):
+    print(f"\n{'route':<26} {'reqs':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  {'vs base p95':>11}")
+    for name, r in result["routes"].items():
+        delta = ""
+        if baseline and name in baseline["routes"] and baseline["routes"][name]["p95_ms"]:
+            change = (r["p95_ms"] / baseline["routes"][name]["p95_ms"] - 1) * 100
+            delta = f"{change:+.0f}%"
+        print(f"{name:<26} {r['requests']:>6} {r['errors']:>4} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}  {delta:>11}")
+
+    print("\nSQL statements per request:")
+    for endpoint, count in result["queries_per_request"].items():
+        base = ""
+        if baseline and endpoint in baseline.get("queries_per_request", {}):
+            base = f"  (baseline {baseline['queries_per_request'][endpoint]})"
+        print(f"  {endpoint:<40} {count:>6}{base}")
+
+    line = f"\nThroughput: {result['throughput_rps']} req/s   Peak RSS: {result['peak_rss_mb']} MB"
+    if baseline:
+        line += f"   (baseline {baseline['throughput_rps']} req/s, {baseline['peak_rss_mb']} MB)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "instance", "bench.db"))
+    parser.add_argument("--rebuild", action="store_true", help="recreate the dataset")
+    parser.add_argument("--members", type=int, default=100000)
+    parser.add_argument("--districts", type=int, default=40)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--donations-per-year", type=float, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--gunicorn", action="store_true", help="drive a real gunicorn process over HTTP")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers (metrics are per worker)")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = os.getenv("DATABASE_URL") or f"sqlite:///{os.path.abspath(args.db)}"
+    # Keep the hash cost of the synthetic logins out of the route numbers
+    os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+    from app import create_app
+    app = create_app()
+
+    is_sqlite = os.environ["DATABASE_URL"].startswith("sqlite")
+    if args.rebuild or (is_sqlite and not os.path.exists(args.db)):
+        print(f"Building dataset: {args.members} members, {args.years:g} years of donations ...")
+        started = time.perf_counter()
+        build_dataset(app, args)
+        print(f"Dataset ready in {time.perf_counter() - started:.1f}s")
+    ensure_users(app)
+
+    server = None
+    try:
+        if args.gunicorn:
+            server = subprocess.Popen(
+                ["gunicorn", "-w", str(args.workers), "-b", f"127.0.0.1:{args.port}", "wsgi:app"],
+                cwd=BACKEND_DIR, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            driver = HttpDriver(f"http://127.0.0.1:{args.port}")
+            for _ in range(50):
+                try:
+                    driver.request("GET", "/metrics")
+                    break
+                except OSError:
+                    time.sleep(0.2)
+        else:
+            driver = TestClientDriver(app)
+
+        latencies, errors, wall, _ = run_workload(
+            driver, args.members, args.districts, args.requests, args.concurrency, args.seed)
+        query_counts = scrape_query_counts(driver)
+        rss = peak_rss_mb(server_pids(server.pid) if server else ())
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    result = summarize(latencies, errors, wall, query_counts, rss)
+    result["config"] = {k: getattr(args, k) for k in
+                        ("members", "districts", "years", "donations_per_year", "seed", "requests", "concurrency", "gunicorn")}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    main()
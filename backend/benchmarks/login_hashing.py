@@ -0,0 +1,105 @@
+"""
+Login latency / throughput at different password hashing settings.
+
+    python benchmarks/login_hashing.py --requests 40 --concurrency 8 \
+        --method pbkdf2:sha256:600000 --method scrypt:32768:8:1 --workers 2
+
+Each run builds a throwaway SQLite database with one user hashed under the
+method being measured, then fires concurrent logins through the test client.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMAIL = "bench@church.com"
+PASSWORD = "bench-password"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run(method, workers, requests, concurrency):
+    import app.utils.passwords as passwords
+    from flask_migrate import stamp
+    from app import create_app
+    from app.extensions import db
+    from app.models import User
+
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    db_file.close()
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+    # Fresh pool per run so the worker count applies
+    passwords._executor = None
+    app = create_app()
+    app.config["PASSWORD_HASH_METHOD"] = method
+    app.config["PASSWORD_HASH_WORKERS"] = workers
+
+    with app.app_context():
+        # create_app doesn't build the schema; same setup as load.py's dataset
+        db.create_all()
+        stamp()
+        db.session.add(User(
+            name="Bench",
+            email=EMAIL,
+            password_hash=passwords.hash_password(PASSWORD),
+            role="member"
+        ))
+        db.session.commit()
+
+    def login(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        elapsed = time.perf_counter() - start
+        return elapsed, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(requests)))
+    wall = time.perf_counter() - started
+
+    os.unlink(db_file.name)
+
+    latencies = [r[0] * 1000 for r in results if r[1] == 200]
+    failures = sum(1 for r in results if r[1] != 200)
+    return {
+        "method": method,
+        "ok": len(latencies),
+        "failed": failures,
+        "p50_ms": statistics.median(latencies) if latencies else 0,
+        "p95_ms": percentile(latencies, 95) if latencies else 0,
+        "throughput": len(latencies) / wall if wall else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", action="append", help="werkzeug hash method (repeatable)")
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool size")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    methods = args.method or ["pbkdf2:sha256:600000", "scrypt:16384:8:1", "scrypt:32768:8:1"]
+
+    print(f"{'method':<24} {'ok':>5} {'fail':>5} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8}")
+    for method in methods:
+        r = run(method, args.workers, args.requests, args.concurrency)
+        print(
+            f"{r['method']:<24} {r['ok']:>5} {r['failed']:>5} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['throughput']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
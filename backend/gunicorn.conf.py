@@ -0,0 +1,46 @@
+# Gunicorn picks this file up automatically when started from backend/.
+#
+# The app factory does no database I/O, so the master can import the app once
+# and fork workers from it instead of every worker rebuilding it on boot.
+# Worker count still comes from WEB_CONCURRENCY / --workers.
+import sys
+import time
+
+preload_app = True
+
+_spawned = {}
+
+
+def on_starting(server):
+    # Refuse to serve an out-of-date schema; done here rather than in wsgi.py
+    # so the Flask CLI can still import the app to run migrations
+    from wsgi import app
+    from app.utils.schema import check_schema_current, SchemaOutOfDateError
+
+    try:
+        check_schema_current(app)
+    except SchemaOutOfDateError as e:
+        server.log.error(str(e))
+        sys.exit(1)
+
+
+def pre_fork(server, worker):
+    _spawned[worker.age] = time.perf_counter()
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from app.extensions import db
+
+    # Each worker opens its own connections rather than sharing the master's
+    with app.app_context():
+        db.engine.dispose()
+
+    # Background job threads must start after the fork; JOB_WORKERS=0 leaves
+    # jobs to a separate `flask run-jobs` process
+    from app.utils.jobs import start_job_runner
+    start_job_runner(app)
+
+    started = _spawned.pop(worker.age, None)
+    if started is not None:
+        server.log.info("Worker %s ready in %.1f ms", worker.pid, (time.perf_counter() - started) * 1000)
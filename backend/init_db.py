@@ -1,8 +1,8 @@
+from flask_migrate import upgrade
 from app import create_app
-from app.models import db
 
 app = create_app()
 
 with app.app_context():
-    db.create_all()
-    print("✅ Database tables created successfully!")
\ No newline at end of file
+    upgrade()
+    print("✅ Database migrated to the latest schema!")
\ No newline at end of file
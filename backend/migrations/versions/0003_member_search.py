@@ -0,0 +1,67 @@
+"""member search index (SQLite FTS5 / Postgres pg_trgm)
+
+Revision ID: 0003_member_search
+Revises: 0002_query_indexes
+Create Date: 2026-10-18 17:05:12.481920
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_member_search'
+down_revision = '0002_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS member_search USING fts5("
+            "name, family, contact, content='member', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_ai AFTER INSERT ON member BEGIN "
+            "INSERT INTO member_search(rowid, name, family, contact) "
+            "VALUES (new.id, new.name, new.family, new.contact); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_ad AFTER DELETE ON member BEGIN "
+            "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+            "VALUES ('delete', old.id, old.name, old.family, old.contact); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_au AFTER UPDATE OF name, family, contact ON member BEGIN "
+            "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+            "VALUES ('delete', old.id, old.name, old.family, old.contact); "
+            "INSERT INTO member_search(rowid, name, family, contact) "
+            "VALUES (new.id, new.name, new.family, new.contact); END"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_member_name_nocase ON member (name COLLATE NOCASE)")
+        # Index the members that already exist
+        op.execute("INSERT INTO member_search(member_search) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_member_search_trgm ON member USING gin ("
+            "(' ' || coalesce(name, '') || ' ' || coalesce(family, '') || ' ' || coalesce(contact, ''))"
+            " gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP INDEX IF EXISTS ix_member_name_nocase")
+        op.execute("DROP TRIGGER IF EXISTS member_search_au")
+        op.execute("DROP TRIGGER IF EXISTS member_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS member_search_ai")
+        op.execute("DROP TABLE IF EXISTS member_search")
+
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_member_search_trgm")
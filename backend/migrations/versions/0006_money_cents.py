@@ -0,0 +1,48 @@
+"""store donation amounts and totals as integer cents
+
+Revision ID: 0006_money_cents
+Revises: 0005_claim_code_lookup
+Create Date: 2026-10-18 17:32:08.114207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_money_cents'
+down_revision = '0005_claim_code_lookup'
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = [
+    ('donation', 'amount'),
+    ('donation_batch', 'total'),
+    ('donation_rollup', 'total'),
+]
+
+
+def upgrade():
+    for table, column in MONEY_COLUMNS:
+        # Scale while the column is still floating point, then retype
+        op.execute(f"UPDATE {table} SET {column} = ROUND({column} * 100)")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Float(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f'ROUND({column})::bigint'
+            )
+
+
+def downgrade():
+    for table, column in MONEY_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.BigInteger(),
+                type_=sa.Float(),
+                existing_nullable=False
+            )
+        op.execute(f"UPDATE {table} SET {column} = {column} / 100.0")
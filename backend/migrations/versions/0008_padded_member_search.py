@@ -0,0 +1,92 @@
+"""member search index: pad words like pg_trgm (SQLite)
+
+Revision ID: 0008_padded_member_search
+Revises: 0007_event_series
+Create Date: 2026-10-18 18:02:37.215904
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_padded_member_search'
+down_revision = '0007_event_series'
+branch_labels = None
+depends_on = None
+
+
+def _padded(column):
+    return f"'  ' || replace(coalesce({column}, ''), ' ', '   ') || ' '"
+
+
+def _row(prefix):
+    return ", ".join(_padded(f"{prefix}.{c}") for c in ('name', 'family', 'contact'))
+
+
+def _drop_index():
+    op.execute("DROP TRIGGER IF EXISTS member_search_au")
+    op.execute("DROP TRIGGER IF EXISTS member_search_ad")
+    op.execute("DROP TRIGGER IF EXISTS member_search_ai")
+    op.execute("DROP TABLE IF EXISTS member_search")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # The indexed text no longer equals member's, so the table is contentless
+    _drop_index()
+    op.execute(
+        "CREATE VIRTUAL TABLE member_search USING fts5("
+        "name, family, contact, content='', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_ai AFTER INSERT ON member BEGIN "
+        "INSERT INTO member_search(rowid, name, family, contact) "
+        f"VALUES (new.id, {_row('new')}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_ad AFTER DELETE ON member BEGIN "
+        "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+        f"VALUES ('delete', old.id, {_row('old')}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_au AFTER UPDATE OF name, family, contact ON member BEGIN "
+        "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+        f"VALUES ('delete', old.id, {_row('old')}); "
+        "INSERT INTO member_search(rowid, name, family, contact) "
+        f"VALUES (new.id, {_row('new')}); END"
+    )
+    op.execute(
+        "INSERT INTO member_search(rowid, name, family, contact) "
+        f"SELECT id, {_row('member')} FROM member"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _drop_index()
+    op.execute(
+        "CREATE VIRTUAL TABLE member_search USING fts5("
+        "name, family, contact, content='member', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_ai AFTER INSERT ON member BEGIN "
+        "INSERT INTO member_search(rowid, name, family, contact) "
+        "VALUES (new.id, new.name, new.family, new.contact); END"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_ad AFTER DELETE ON member BEGIN "
+        "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+        "VALUES ('delete', old.id, old.name, old.family, old.contact); END"
+    )
+    op.execute(
+        "CREATE TRIGGER member_search_au AFTER UPDATE OF name, family, contact ON member BEGIN "
+        "INSERT INTO member_search(member_search, rowid, name, family, contact) "
+        "VALUES ('delete', old.id, old.name, old.family, old.contact); "
+        "INSERT INTO member_search(rowid, name, family, contact) "
+        "VALUES (new.id, new.name, new.family, new.contact); END"
+    )
+    op.execute("INSERT INTO member_search(member_search) VALUES ('rebuild')")
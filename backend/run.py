@@ -1,6 +1,8 @@
 from app import create_app
+from app.utils.schema import check_schema_current
 
 app = create_app()
 
 if __name__ == "__main__":
+    check_schema_current(app)
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -5,12 +5,15 @@ from app.models import (
     Member,
     Sacrament,
     Event,
+    EventSeries,
     Donation,
     District,
     Announcement
 )
 from datetime import date
 import random
+from flask_migrate import stamp
+from app.utils.rollups import rebuild_rollups
 from werkzeug.security import generate_password_hash
 
 app = create_app()
@@ -18,6 +21,7 @@ app = create_app()
 with app.app_context():
     db.drop_all()
     db.create_all()
+    stamp()  # create_all built the latest schema; record it for migrations
 
     # ---------------- USERS ----------------
     admin = User(
@@ -82,16 +86,18 @@ with app.app_context():
     db.session.commit()
 
     # ---------------- EVENTS ----------------
-    events = []
-    for i in range(1, 6):
-        event = Event(
-            name=f"Sunday Mass {i}",
-            description="Weekly Sunday service",
-            date=date(2025, 12, i)
-        )
-        events.append(event)
-
-    db.session.add_all(events)
+    # Weekly Mass is one recurring series, expanded per calendar window
+    db.session.add(EventSeries(
+        name="Sunday Mass",
+        description="Weekly Sunday service",
+        rrule="FREQ=WEEKLY;BYDAY=SU",
+        start_date=date(2025, 12, 7)
+    ))
+    db.session.add(Event(
+        name="Christmas Carol Service",
+        description="Parish carols and readings",
+        date=date(2025, 12, 21)
+    ))
     db.session.commit()
 
     # ---------------- DONATIONS ----------------
@@ -133,6 +139,10 @@ with app.app_context():
     db.session.add_all(announcements)
     db.session.commit()
 
+    # ---------------- DONATION ROLLUPS ----------------
+    # The seeded donations bypass record_donation; /donations/summary reads rollups
+    rebuild_rollups()
+
     print("✅ Database seeded successfully with districts & announcements!")
     print("\n📝 Test credentials:")
     print("   Admin - email: admin@church.com, password: admin123")
@@ -1,3 +1,6 @@
 from app import create_app
 
+# No schema check here: the Flask CLI auto-discovers this module, and
+# `flask db upgrade` / `flask bootstrap` must run against an old database.
+# gunicorn.conf.py (on_starting) and run.py check before serving instead.
 app = create_app()